@@ -0,0 +1,62 @@
+# %% markdown
+# ### Column projection: full event loads against projected and filtered reads of the cache.
+# The plotting scripts keep a handful of columns of the passes or shots, yet load every column of every
+# event plus the related, freeze and tactics tables. Each load runs in a fresh interpreter so its
+# peak RSS is measured on its own, the caches are built beforehand so only reading is timed.
+
+# %% codecell
+import json
+import subprocess
+import sys
+from soccermatics.statsbomb import EventStore
+from soccermatics.wyscout import load_events
+
+# Women's World Cup 2019, and build the caches
+EventStore().events(EventStore().match(competition_id=72, season_id=30))
+load_events('England')
+
+SETUP = '''
+import resource, time
+from soccermatics.statsbomb import EventStore
+from soccermatics.wyscout import load_events
+import pandas as pd
+parser = EventStore()
+matches = parser.match(competition_id=72, season_id=30)
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+'''
+REPORT = '''
+seconds = time.perf_counter() - start
+print(json.dumps([len(df), df.shape[1], seconds, baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]))
+'''
+LOADS = {
+    'StatsBomb, all tables': '''
+df, related, freeze, tactics = parser.events(matches)
+df = df.loc[df.type_name == 'Pass', ['x', 'y', 'end_x', 'end_y', 'player_name', 'team_name', 'outcome_name']]
+''',
+    'StatsBomb, passes projected': '''
+df = parser.scan(matches, ['x', 'y', 'end_x', 'end_y', 'player_name', 'team_name', 'outcome_name'],
+                 [('type_name', '==', 'Pass')])
+''',
+    'Wyscout, read_json': '''
+df = pd.read_json('data/Wyscout/events/events_England.json')
+df = df.loc[df.eventName == 'Shot', ['playerId', 'teamId', 'positions', 'tags']]
+''',
+    'Wyscout, full cache': '''
+df = load_events('England')
+df = df.loc[df.eventName == 'Shot', ['playerId', 'teamId', 'positions', 'tag_mask']]
+''',
+    'Wyscout, shots projected': '''
+df = load_events('England', columns=['playerId', 'teamId', 'positions', 'tag_mask'],
+                 filters=[('eventName', '==', 'Shot')])
+''',
+}
+
+# %% codecell
+for name, code in LOADS.items():
+    output = subprocess.run([sys.executable, '-c', 'import json' + SETUP + code + REPORT],
+                            capture_output=True, text=True, check=True).stdout
+    # ru_maxrss is in kB on Linux, baseline is the peak after the imports
+    rows, columns, seconds, baseline, peak = json.loads(output.splitlines()[-1])
+    print(f'{name:28}: {rows} x {columns} in {seconds * 1000:.0f}ms, '
+          f'peak RSS {peak / 1024:.0f}MB (+{(peak - baseline) / 1024:.1f}MB over the imports)')
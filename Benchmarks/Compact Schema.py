@@ -0,0 +1,39 @@
+# %% markdown
+# ### Compact schema: memory of the event tables before and after the dtypes of soccermatics.schema.
+# Names become categoricals, coordinates float32 and ids the smallest integers that hold them.
+# memory_usage(deep=True) of every column is compared for the Wyscout events as read_json returns them
+# and the StatsBomb events of a tournament as the parser returns them.
+
+# %% codecell
+import pandas as pd
+from soccermatics import schema
+from soccermatics.statsbomb import EventStore
+from soccermatics.wyscout import data_path, load_events, read_json
+
+pd.set_option('display.width', 120)
+
+# %% codecell
+before = read_json(data_path('events', 'events_England.json'))
+after = load_events('England')
+report = schema.memory_report(before, after)
+print(report.round(2))
+print(f"Wyscout events: {report.loc['total', 'before']:.1f}MB -> {report.loc['total', 'after']:.1f}MB")
+# the nested tags and positions lists are kept for the scripts that read them and dominate the total,
+# tag_mask and the coordinate columns hold the same information in 24 bytes per event
+flat = report.drop(index=['tags', 'positions', 'total'])
+print(f"Wyscout events without the nested lists: {flat['before'].sum():.1f}MB -> {flat['after'].sum():.1f}MB")
+
+# %% codecell
+# Women's World Cup 2019
+matches = EventStore().match(competition_id=72, season_id=30)
+before, = EventStore(compact=False).events(matches, tables=('event',))
+after, = EventStore().events(matches, tables=('event',))
+report = schema.memory_report(before, after)
+print(report.round(2))
+print(f"StatsBomb events: {report.loc['total', 'before']:.1f}MB -> {report.loc['total', 'after']:.1f}MB")
+
+# %% codecell
+# the names behind the integer ids
+players = schema.lookup_table(after, 'player_id', 'player_name')
+teams = schema.lookup_table(after, 'team_id', 'team_name')
+print(f'{len(players)} players, {len(teams)} teams')
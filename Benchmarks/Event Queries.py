@@ -0,0 +1,69 @@
+# %% markdown
+# ### Event queries: chained pandas comparisons against the memoized masks of soccermatics.query.
+# The scripts build masks like (df.type_name == 'Pass') & (df.team_name == ...) & (df.sub_type_name != 'Throw-in')
+# in every cell, comparing the strings of every row again each time. EventQuery looks the categorical codes up
+# in a table of the wanted values and keeps the mask of every predicate, so a query that shares predicates with
+# an earlier one only intersects masks it already has.
+# The table holds the events of every Wyscout competition in data/Wyscout.
+
+# %% codecell
+import timeit
+from soccermatics.query import EventQuery
+from soccermatics.tags import has_tags
+from soccermatics.wyscout import load_all_events
+
+# read in this process, a process pool would need the whole script behind a main guard
+events = load_all_events(processes=1)
+teams = events['teamId'].value_counts().index[:3].tolist()
+
+# the kind of queries a session of scripts runs, each with its chained pandas version
+queries = []
+for team in teams:
+    queries += [
+        ({'type': 'Pass', 'team': team},
+         lambda df, team=team: (df.eventName == 'Pass') & (df.teamId == team)),
+        ({'type': 'Pass', 'team': team, 'exclude_sub': 'Cross', 'successful': True},
+         lambda df, team=team: (df.eventName == 'Pass') & (df.teamId == team) & (df.subEventName != 'Cross') & has_tags(df, 'accurate')),
+        ({'type': 'Shot', 'team': team},
+         lambda df, team=team: (df.eventName == 'Shot') & (df.teamId == team)),
+        ({'type': ['Pass', 'Free Kick'], 'team': team, 'successful': False},
+         lambda df, team=team: df.eventName.isin(['Pass', 'Free Kick']) & (df.teamId == team) & ~has_tags(df, 'accurate')),
+    ]
+
+# %% codecell
+# both versions must select the same events
+query = EventQuery(events)
+for predicates, chained in queries:
+    assert (query.mask(**predicates) == chained(events).to_numpy()).all(), predicates
+
+
+def run_chained():
+    for _, chained in queries:
+        chained(events)
+
+
+def run_cold():
+    # a new EventQuery every run, so only masks shared between the queries of one run are reused
+    query = EventQuery(events)
+    for predicates, _ in queries:
+        query.mask(**predicates)
+
+
+def run_warm():
+    for predicates, _ in queries:
+        query.mask(**predicates)
+
+
+chained_time = min(timeit.repeat(run_chained, number=1, repeat=5))
+cold_time = min(timeit.repeat(run_cold, number=1, repeat=5))
+warm_time = min(timeit.repeat(run_warm, number=10, repeat=5)) / 10
+print(f'{len(queries)} queries over {len(events)} events')
+print(f'chained comparisons: {chained_time * 1000:.1f}ms')
+print(f'EventQuery, first run: {cold_time * 1000:.1f}ms, {chained_time / cold_time:.1f}x faster')
+print(f'EventQuery, repeated: {warm_time * 1000:.3f}ms, {chained_time / warm_time:.0f}x faster')
+
+# %% codecell
+# the cache holds maxsize masks of one byte per event, older ones are evicted first
+query = EventQuery(events, maxsize=8)
+run_warm()
+print(query.cache_info(), f'{query.maxsize * len(events) / 2 ** 20:.1f}MB at most')
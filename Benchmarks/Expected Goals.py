@@ -0,0 +1,53 @@
+# %% markdown
+# ### Expected goals: training and scoring.
+# The xG features are computed for all shots as arrays and scoring is one matrix product.
+# The reference computes the features and the logistic function row by row with apply.
+# Run it from a directory with data/Wyscout.
+
+# %% codecell
+import math
+import time
+import pandas as pd
+from soccermatics import wyscout
+from soccermatics.normalize import PITCH_LENGTH, PITCH_WIDTH
+from soccermatics.tags import bits
+from soccermatics.xg import GOAL_WIDTH, ExpectedGoals, load_wyscout_shots
+
+names = wyscout.competitions()
+events = pd.concat([wyscout.load_events(name, columns=['eventName', 'x', 'y', 'tag_mask'],
+                                        filters=[('eventName', '==', 'Shot')]) for name in names],
+                   ignore_index=True)
+print(f'{len(events)} shots in {len(names)} competitions')
+
+# %% codecell
+start = time.perf_counter()
+shots = pd.concat([load_wyscout_shots(name, refresh=True) for name in names], ignore_index=True)
+feature_time = time.perf_counter() - start
+start = time.perf_counter()
+model = ExpectedGoals.fit(shots)
+fit_time = time.perf_counter() - start
+print(f'features and cache {feature_time * 1000:.0f}ms, logistic fit {fit_time * 1000:.0f}ms')
+print(model.summary)
+
+# %% codecell
+def row_xg(shot):
+    # one shot at a time, as with df.apply
+    x, y = shot.x * PITCH_LENGTH / 100, (100 - shot.y) * PITCH_WIDTH / 100
+    dx, dy = PITCH_LENGTH - x, abs(PITCH_WIDTH / 2 - y)
+    angle = math.atan2(GOAL_WIDTH * dx, dx ** 2 + dy ** 2 - (GOAL_WIDTH / 2) ** 2)
+    angle = angle + math.pi if angle < 0 else angle
+    header = int(shot.tag_mask) & int(bits('head_body')) != 0
+    logit = (model.params['const'] + model.params['distance'] * math.hypot(dx, dy)
+             + model.params['angle'] * angle + model.params['header'] * header)
+    return 1 / (1 + math.exp(-logit))
+
+start = time.perf_counter()
+applied = events.apply(row_xg, axis=1)
+apply_time = time.perf_counter() - start
+
+start = time.perf_counter()
+scored = model.score(events, 'wyscout')
+score_time = time.perf_counter() - start
+print(f'apply: {apply_time * 1000:.0f}ms, score: {score_time * 1000:.2f}ms, {apply_time / score_time:.0f}x faster')
+# the row version scales the Wyscout coordinates linearly instead of mapping the pitch markings, so the values differ slightly
+print(f'mean xG {applied.mean():.4f} (apply) and {scored.mean():.4f} (score)')
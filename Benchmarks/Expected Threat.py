@@ -0,0 +1,58 @@
+# %% markdown
+# ### Expected threat: fitting xT on a league season.
+# ExpectedThreat.fit counts the actions of every zone with bincount and runs the value iteration as
+# matrix products. The reference below is the usual tutorial version, which loops over the zones
+# and their transitions in Python.
+
+# %% codecell
+import time
+import numpy as np
+from soccermatics.normalize import normalize
+from soccermatics.wyscout import load_events
+from soccermatics.xt import ExpectedThreat, actions, load_expected_threat
+
+start = time.perf_counter()
+events = load_events('England', columns=['matchId', 'matchPeriod', 'teamId', 'eventName', 'x', 'y', 'end_x', 'end_y', 'tag_mask'],
+                     filters=[('eventName', 'in', ['Pass', 'Shot'])])
+moves = actions(normalize(events, 'wyscout'), 'wyscout')
+print(f'{len(moves)} moves and shots loaded in {time.perf_counter() - start:.2f}s')
+
+# %% codecell
+def loop_fit(moves, grid, iterations=5):
+    # one zone at a time, as in most xT tutorials: the probabilities of each zone from its own actions,
+    # then every iteration loops over the zones and the zones their moves end in
+    start, end = grid.bin(moves.x, moves.y), grid.bin(moves.end_x, moves.end_y)
+    shoot, move, transitions = [0.0] * grid.size, [0.0] * grid.size, []
+    for zone in range(grid.size):
+        in_zone = start == zone
+        shots, zone_moves = (in_zone & moves.shot).sum(), (in_zone & moves.move).sum()
+        total = max(shots + zone_moves, 1)
+        shoot[zone] = shots / total * (in_zone & moves.goal).sum() / max(shots, 1)
+        move[zone] = zone_moves / total
+        ends = end[in_zone & moves.successful]
+        transitions.append({target: (ends == target).sum() / max(zone_moves, 1) for target in set(ends[ends >= 0].tolist())})
+    xt = [0.0] * grid.size
+    for _ in range(iterations):
+        xt = [shoot[zone] + move[zone] * sum(p * xt[target] for target, p in transitions[zone].items())
+              for zone in range(grid.size)]
+    return np.array(xt)
+
+
+# %% codecell
+start = time.perf_counter()
+model = ExpectedThreat.fit(moves)
+fit_time = time.perf_counter() - start
+print(f'ExpectedThreat.fit: {fit_time * 1000:.1f}ms')
+
+start = time.perf_counter()
+reference = loop_fit(moves, model.grid)
+loop_time = time.perf_counter() - start
+print(f'zone loop, 5 iterations: {loop_time:.2f}s ({loop_time / fit_time:.0f}x slower)')
+# after 5 iterations the reference is the 5 action horizon, the fit runs to convergence
+print('largest difference from the reference:', np.abs(ExpectedThreat.fit(moves, max_iterations=5).xt - reference).max())
+
+# %% codecell
+# the fitted grid is cached next to the events file, later loads read 192 rows
+start = time.perf_counter()
+load_expected_threat('England')
+print(f'cached load: {(time.perf_counter() - start) * 1000:.1f}ms')
@@ -0,0 +1,57 @@
+# %% markdown
+# ### 360 freeze frames: per-event groupby against fixed-shape arrays.
+# The reference loops over the events of a 360 match with groupby and computes the nearest opponent,
+# the defenders between ball and goal and the openness of each passing lane player by player.
+# FreezeFrames puts every event's players into one (event, slot, xy) array and computes them at once.
+
+# %% codecell
+import time
+import numpy as np
+from matplotlib.path import Path
+from soccermatics.freeze_frames import FreezeFrames, GOAL_X, GOAL_Y, GOAL_WIDTH, load_freeze_frames
+from soccermatics.statsbomb import EventStore
+
+parser = EventStore()
+MATCH_ID = 3788741
+frame, = parser.frame(MATCH_ID, tables=('frame',))
+events, = parser.event(MATCH_ID, tables=('event',), columns=['id', 'x', 'y'])
+location = events.set_index('id')[['x', 'y']]
+print(f'{frame["id"].nunique()} frames, {len(frame)} players')
+
+# %% codecell
+def loop_metrics(frame):
+    rows = {}
+    posts = [(GOAL_X, GOAL_Y - GOAL_WIDTH / 2), (GOAL_X, GOAL_Y + GOAL_WIDTH / 2)]
+    for event_id, players in frame.groupby('id', sort=False):
+        ball = location.loc[event_id].to_numpy(float)
+        opponents = players.loc[~players.teammate, ['x', 'y']].to_numpy(float)
+        receivers = players.loc[players.teammate & ~players.actor, ['x', 'y']].to_numpy(float)
+        between = Path([ball, *posts]).contains_points(opponents).sum()
+        nearest = np.linalg.norm(opponents - ball, axis=1).min() if len(opponents) else np.nan
+        lanes = []
+        for receiver in receivers:
+            lane = receiver - ball
+            t = np.clip((opponents - ball) @ lane / max(lane @ lane, 1e-9), 0, 1)
+            lanes.append(np.linalg.norm(ball + t[:, None] * lane - opponents, axis=1).min() if len(opponents) else np.nan)
+        rows[event_id] = between, nearest, sum(lane > 2 for lane in lanes)
+    return rows
+
+start = time.perf_counter()
+reference = loop_metrics(frame)
+loop_time = time.perf_counter() - start
+print(f'groupby loop: {loop_time:.2f}s')
+
+# %% codecell
+start = time.perf_counter()
+frames = FreezeFrames.from_frame(frame, events)
+metrics = frames.metrics()
+array_time = time.perf_counter() - start
+print(f'arrays and metrics: {array_time * 1000:.0f}ms, {loop_time / array_time:.0f}x faster')
+assert all(metrics.loc[event_id, 'open_lanes'] == open_lanes for event_id, (_, _, open_lanes) in reference.items())
+
+# %% codecell
+# later queries read the cached arrays
+load_freeze_frames(parser, MATCH_ID, refresh=True)
+start = time.perf_counter()
+load_freeze_frames(parser, MATCH_ID).metrics()
+print(f'cached arrays and metrics: {(time.perf_counter() - start) * 1000:.0f}ms')
@@ -0,0 +1,39 @@
+# %% markdown
+# ### Name lookups: string scans of players.json against the dimension index of soccermatics.dimensions.
+# Sign test.py used to find a player with players.loc[players['shortName'] == name], which compares every
+# name in the table for each lookup. The index resolves a name with two hash map lookups, and also finds
+# names typed without accents, in another case or with the names in another order.
+
+# %% codecell
+import time
+import numpy as np
+from soccermatics.dimensions import normalize_name, wyscout_players
+from soccermatics.wyscout import load_players
+
+players = load_players()
+start = time.perf_counter()
+index = wyscout_players()
+build_time = time.perf_counter() - start
+names = players['shortName'].sample(2000, replace=True, random_state=42).tolist()
+
+# %% codecell
+start = time.perf_counter()
+scan_ids = [players.loc[players['shortName'] == name, 'wyId'].iloc[0] for name in names]
+scan_time = time.perf_counter() - start
+
+start = time.perf_counter()
+# ambiguous names raise, so the lookups go through candidates and keep the first id like the scan does
+index_ids = [index.candidates(name)[0] for name in names]
+index_time = time.perf_counter() - start
+
+# the scan returns the first row with the name, the index every id with it, so shared names may differ
+same = np.mean([scan_id in index.candidates(name) for scan_id, name in zip(scan_ids, names)])
+print(f'index of {len(index)} players built in {build_time * 1000:.1f}ms')
+print(f'{len(names)} lookups: string scans {scan_time * 1000:.1f}ms, index {index_time * 1000:.1f}ms, '
+      f'{scan_time / index_time:.0f}x faster, {same:.0%} agree')
+
+# %% codecell
+# names as a user types them, without accents, in lower case or with the names reversed
+typed = [' '.join(reversed(normalize_name(name).split())) for name in names[:200]]
+found = np.mean([name in index for name in typed])
+print(f'{found:.0%} of {len(typed)} retyped names found')
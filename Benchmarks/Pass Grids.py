@@ -0,0 +1,48 @@
+# %% markdown
+# ### Pass map grids: serial pitch.grid against the parallel batch renderer.
+# Plotting Passes.py draws a fixed 4x4 pitch.grid and redraws the pitch in every panel.
+# save_pass_grids sizes the grid to the players, reuses a pitch rendered once per process
+# and renders the teams of every match in a process pool.
+
+# %% codecell
+import os
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch
+from soccermatics.plotting import save_pass_grids
+from soccermatics.statsbomb import EventStore
+
+parser = EventStore()
+# Women's World Cup 2019
+matches = parser.match(competition_id=72, season_id=30)
+df, related, freeze, tactics = parser.events(matches)
+passes = df.loc[(df.type_name == 'Pass') & (df.sub_type_name != 'Throw-in'),
+                ['match_id', 'team_name', 'x', 'y', 'end_x', 'end_y', 'player_name']]
+out_dir = os.path.join(os.getcwd(), 'output', 'pass_grids')
+os.makedirs(out_dir, exist_ok=True)
+
+# %% codecell
+# the grid of Plotting Passes.py, one figure after another
+start = time.perf_counter()
+groups = passes.groupby(['match_id', 'team_name'])
+for (match_id, team), team_passes in groups:
+    names = team_passes['player_name'].unique()
+    pitch = Pitch(line_color='black', pad_top=20)
+    fig, axs = pitch.grid(ncols=4, nrows=4, grid_height=0.85, title_height=0.06, axis=False,
+                          endnote_height=0.04, title_space=0.04, endnote_space=0.01)
+    for player, ax in zip(names, axs['pitch'].flat[:len(names)]):
+        ax.text(60, -10, player, ha='center', va='center', fontsize=14)
+        player_df = team_passes.loc[team_passes['player_name'] == player]
+        pitch.scatter(player_df.x, player_df.y, alpha=0.2, s=50, color='blue', ax=ax)
+        pitch.arrows(player_df.x, player_df.y, player_df.end_x, player_df.end_y, color='blue', ax=ax, width=1)
+    fig.savefig(os.path.join(out_dir, f'script_{match_id}_{team}.png'))
+    plt.close(fig)
+serial_time = time.perf_counter() - start
+print(f'serial pitch.grid: {groups.ngroups / serial_time:.2f} figures per second')
+
+start = time.perf_counter()
+timings = save_pass_grids(passes, out_dir)
+batch_time = time.perf_counter() - start
+print(f'save_pass_grids: {len(timings) / batch_time:.2f} figures per second ({timings.mean():.2f}s per figure in each worker)')
@@ -0,0 +1,74 @@
+# %% markdown
+# ### Passing networks: script logic against the vectorized builder.
+# Passing Networks.py looks up both ends of every edge with mean_location.loc[...] scans and builds the
+# pair key with a row-wise apply. passing_networks builds the networks of every team in every match
+# with integer player codes, bincounts and array indexing.
+
+# %% codecell
+import time
+from soccermatics.networks import goalkeepers, passing_metrics, passing_networks
+from soccermatics.statsbomb import EventStore
+
+parser = EventStore()
+# Women's World Cup 2019
+matches = parser.match(competition_id=72, season_id=30)
+df, related, freeze, tactics = parser.events(matches)
+
+passes = df.loc[(df.type_name == 'Pass') & (df.outcome_name.isnull()) & (df.sub_type_name != 'Throw-in'),
+                ['match_id', 'team_name', 'x', 'y', 'end_x', 'end_y', 'player_name', 'pass_recipient_name']]
+passes = passes.loc[passes.pass_recipient_name.notnull()]
+print(f'{len(matches)} matches, {len(passes)} completed passes')
+
+# %% codecell
+def script_network(team_passes):
+    # the logic of Passing Networks.py for one team in one match
+    columns = ['x', 'y', 'end_x', 'end_y']
+    pass_location = team_passes.groupby('player_name')[columns].mean()
+    recieve_location = team_passes.groupby('pass_recipient_name')[columns].mean()
+    mean_location = pass_location.join(recieve_location, how='inner', rsuffix='_recieve').reset_index()
+    mean_location['mean_x'] = mean_location[['x', 'end_x_recieve']].mean(axis=1)
+    mean_location['mean_y'] = mean_location[['y', 'end_y_recieve']].mean(axis=1)
+    team_passes = team_passes.copy()
+    team_passes['pair_key'] = team_passes.apply(lambda x: "_".join(sorted([x.player_name, x.pass_recipient_name])), axis=1)
+    passing_pairs = team_passes.groupby('pair_key', as_index=False).size()
+    edges = []
+    for pair in passing_pairs.itertuples():
+        passer, recipient = pair.pair_key.split("_")
+        if not (mean_location['player_name'] == passer).any() or not (mean_location['player_name'] == recipient).any():
+            continue
+        passer_x = mean_location.loc[mean_location['player_name'] == passer].mean_x.iloc[0]
+        passer_y = mean_location.loc[mean_location['player_name'] == passer].mean_y.iloc[0]
+        recipient_x = mean_location.loc[mean_location['player_name'] == recipient].mean_x.iloc[0]
+        recipient_y = mean_location.loc[mean_location['player_name'] == recipient].mean_y.iloc[0]
+        edges.append((passer, recipient, pair.size, passer_x, passer_y, recipient_x, recipient_y))
+    return mean_location, edges
+
+start = time.perf_counter()
+script_edges = 0
+for _, team_passes in passes.groupby(['match_id', 'team_name']):
+    script_edges += len(script_network(team_passes)[1])
+script_time = time.perf_counter() - start
+
+start = time.perf_counter()
+nodes, edges = passing_networks(passes, by=['match_id', 'team_name'])
+vectorized_time = time.perf_counter() - start
+
+assert script_edges == len(edges)
+print(f'script logic: {script_time:.2f}s, vectorized: {vectorized_time:.3f}s, {script_time / vectorized_time:.0f}x faster')
+print(f'{len(nodes)} nodes and {len(edges)} edges in {nodes.groupby(["match_id", "team_name"]).ngroups} networks')
+
+# %% markdown
+# ### Network metrics for every team in every match.
+# Centralisation, density and the hub are computed from one (match x passer x recipient) array,
+# then averaged into a league table.
+
+# %% codecell
+start = time.perf_counter()
+metrics = passing_metrics(passes, by=['match_id', 'team_name'])
+metrics_no_keeper = passing_metrics(passes, by=['match_id', 'team_name'], exclude=goalkeepers(df))
+metrics_time = time.perf_counter() - start
+print(f'metrics for {len(metrics)} networks, with and without goalkeepers: {metrics_time:.3f}s')
+
+league_table = metrics.groupby('team_name')[['passes', 'centralisation', 'directed_density', 'undirected_density']].mean()
+league_table['centralisation_no_keeper'] = metrics_no_keeper.groupby('team_name')['centralisation'].mean()
+print(league_table.sort_values('centralisation'))
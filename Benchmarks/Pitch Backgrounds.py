@@ -0,0 +1,57 @@
+# %% markdown
+# ### Pitch backgrounds: Pitch(...).draw() for every figure against the cached background.
+# Every pitch of Pitch Basics.py is drawn with a few points on top and saved to PNG, once redrawing
+# the pitch in each figure and once reusing the background rendered the first time.
+
+# %% codecell
+import io
+import time
+import numpy as np
+from mplsoccer import Pitch, VerticalPitch
+from soccermatics.pitches import headless_figure, pitch_figure
+
+FIGURES = 20
+FIGSIZE = (8, 5.5)
+# (vertical, pitch arguments) of the pitches in Pitch Basics.py
+PITCHES = {
+    'striped': (False, dict(pitch_color='grass', line_color='white', stripe=True)),
+    'vertical': (True, dict(pitch_color='grass', line_color='white', stripe=True)),
+    'half': (False, dict(pitch_color='grass', line_color='white', stripe=True, half=True, corner_arcs=True)),
+    'custom pads': (True, dict(half=True, pitch_color='grass', line_color='white', stripe=True,
+                               pad_left=-15, pad_right=-15, pad_top=1.5, pad_bottom=-36)),
+    'positional': (False, dict(pitch_color='grass', line_color='white', stripe=True, goal_type='box',
+                               positional=True, shade_middle=True, positional_linestyle='--',
+                               positional_color='white', shade_color='#d9e829')),
+}
+rng = np.random.default_rng(0)
+x, y = rng.uniform(0, 120, 30), rng.uniform(0, 80, 30)
+
+
+def save(fig):
+    fig.savefig(io.BytesIO(), format='png')
+
+
+# %% codecell
+for name, (vertical, kwargs) in PITCHES.items():
+    start = time.perf_counter()
+    for _ in range(FIGURES):
+        pitch = (VerticalPitch if vertical else Pitch)(**kwargs)
+        fig = headless_figure(FIGSIZE)
+        ax = fig.add_axes((0, 0, 1, 1))
+        pitch.draw(ax=ax)
+        pitch.scatter(x, y, s=100, color='red', ax=ax)
+        save(fig)
+    redraw = (time.perf_counter() - start) / FIGURES
+
+    # the first figure renders and caches the background, the rest reuse it
+    start = time.perf_counter()
+    pitch, fig, ax = pitch_figure(vertical, FIGSIZE, cache_dir=False, refresh=True, **kwargs)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(FIGURES):
+        pitch, fig, ax = pitch_figure(vertical, FIGSIZE, **kwargs)
+        pitch.scatter(x, y, s=100, color='red', ax=ax)
+        save(fig)
+    cached = (time.perf_counter() - start) / FIGURES
+    print(f'{name:12}: draw {redraw * 1000:.1f}ms, cached {cached * 1000:.1f}ms per figure '
+          f'({redraw / cached:.1f}x, first render {first * 1000:.0f}ms)')
@@ -0,0 +1,37 @@
+# %% markdown
+# ### Pitch control: grid resolutions and distance methods.
+# Voronoi regions and the time-to-intercept surface need the distance from every grid cell to every
+# player of every event. numpy computes them in chunks of events as one broadcast, kdtree queries one
+# KD-tree holding the players of all events. Both are timed for a 360 match at several resolutions,
+# and the time for a season of 360 matches is extrapolated from it.
+
+# %% codecell
+import time
+from soccermatics.freeze_frames import load_freeze_frames
+from soccermatics.pitch_control import ControlGrid, control_metrics, load_pitch_control, pitch_control
+from soccermatics.statsbomb import EventStore
+
+parser = EventStore()
+MATCH_ID = 3788741
+# matches in a season with 360 data
+SEASON_MATCHES = 380
+frames = load_freeze_frames(parser, MATCH_ID)
+print(f'{len(frames)} events with freeze frames')
+
+# %% codecell
+for columns, rows in ((24, 16), (60, 40), (120, 80)):
+    grid = ControlGrid(columns, rows)
+    for method in ('numpy', 'kdtree'):
+        start = time.perf_counter()
+        control = pitch_control(frames, grid, method=method)
+        control_metrics(frames, grid, method=method, control=control)
+        seconds = time.perf_counter() - start
+        print(f'{columns}x{rows} {method:6}: {seconds:.2f}s per match, '
+              f'{seconds * SEASON_MATCHES / 60:.0f} minutes per season')
+
+# %% codecell
+# the cached results of a match
+load_pitch_control(parser, MATCH_ID)
+start = time.perf_counter()
+metrics, surface = load_pitch_control(parser, MATCH_ID)
+print(f'cached load: {(time.perf_counter() - start) * 1000:.0f}ms, surface {surface.shape}')
@@ -0,0 +1,50 @@
+# %% markdown
+# ### Shot maps: one scatter per shot against one scatter per team and outcome.
+# Plotting Shots.py calls pitch.scatter once for every shot. shot_map mirrors the second team's shots
+# as arrays and draws one collection per (team, goal or not). Every match of a competition is rendered to PNG.
+
+# %% codecell
+import os
+import time
+from mplsoccer import Pitch
+from soccermatics.plotting import headless_figure, save_shot_maps
+from soccermatics.statsbomb import EventStore
+
+parser = EventStore()
+# Women's World Cup 2019
+matches = parser.match(competition_id=72, season_id=30)
+df, related, freeze, tactics = parser.events(matches)
+shots = df.loc[df.type_name == 'Shot', ['match_id', 'team_name', 'x', 'y', 'outcome_name', 'player_name']]
+out_dir = os.path.join(os.getcwd(), 'output', 'shot_maps')
+
+# %% codecell
+def script_shot_map(match_shots, pitch, ax):
+    # the per-shot loop of Plotting Shots.py
+    team1, team2 = match_shots.team_name.unique()[:2]
+    for shot in match_shots.itertuples():
+        x, y = (shot.x, shot.y) if shot.team_name == team1 else (120 - shot.x, 80 - shot.y)
+        color = 'red' if shot.team_name == team1 else 'blue'
+        if shot.outcome_name == 'Goal':
+            pitch.scatter(x, y, alpha=1, s=500, color=color, ax=ax)
+            pitch.annotate(shot.player_name, (x + 1, y - 2), ax=ax, fontsize=12)
+        else:
+            pitch.scatter(x, y, alpha=0.2, s=500, color=color, ax=ax)
+
+pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
+os.makedirs(out_dir, exist_ok=True)
+script_times = []
+for match_id, match_shots in shots.groupby('match_id'):
+    start = time.perf_counter()
+    fig = headless_figure((10, 7))
+    ax = fig.add_subplot()
+    pitch.draw(ax=ax)
+    script_shot_map(match_shots, pitch, ax)
+    fig.savefig(os.path.join(out_dir, f'script_{match_id}.png'), dpi=100)
+    script_times.append(time.perf_counter() - start)
+
+start = time.perf_counter()
+timings = save_shot_maps(shots, out_dir, pitch=pitch)
+total = time.perf_counter() - start
+
+print(f'per-shot scatter: {sum(script_times) / len(script_times) * 1000:.0f}ms per figure')
+print(f'shot_map: {timings.mean() * 1000:.0f}ms per figure, {len(timings)} figures in {total:.1f}s')
@@ -0,0 +1,36 @@
+# %% markdown
+# ### Sign tests: one player at a time against every player at once.
+# Sign test.py filters one player's shots and calls statsmodels sign_test.
+# footedness counts left and right foot shots of every player in one grouped pass and
+# computes all the binomial p-values together.
+
+# %% codecell
+import time
+from statsmodels.stats.descriptivestats import sign_test
+from soccermatics.stats import footedness
+from soccermatics.tags import has_tags
+from soccermatics.wyscout import load_all_events, load_players
+
+# read in this process, a process pool would need the whole script behind a main guard
+events = load_all_events(processes=1)
+players = load_players()
+MIN_SHOTS = 10
+
+# %% codecell
+start = time.perf_counter()
+shots = events.loc[events['eventName'] == 'Shot']
+loop_pvalues = {}
+for player_id, player_shots in shots.groupby('playerId'):
+    lefty = has_tags(player_shots, 'left_foot').sum()
+    righty = has_tags(player_shots, 'right_foot').sum()
+    if lefty + righty >= MIN_SHOTS:
+        loop_pvalues[player_id] = sign_test([1] * lefty + [-1] * righty, mu0=0)[1]
+loop_time = time.perf_counter() - start
+
+start = time.perf_counter()
+ranked = footedness(events, players, min_shots=MIN_SHOTS)
+vectorized_time = time.perf_counter() - start
+
+assert len(ranked) == len(loop_pvalues)
+assert all(abs(ranked.loc[player_id, 'pvalue'] - pvalue) < 1e-12 for player_id, pvalue in loop_pvalues.items())
+print(f'{len(ranked)} players: one test per player {loop_time:.2f}s, vectorized {vectorized_time * 1000:.1f}ms')
@@ -0,0 +1,36 @@
+# %% markdown
+# ### Tag filters: row-wise apply against the tag bitmask.
+# Wyscout tags are lists of dicts per event. Filtering with apply runs a Python loop over every row,
+# while the tag_mask column decoded at load time turns the same filter into one bitwise operation.
+
+# %% codecell
+import timeit
+from soccermatics.wyscout import load_events
+from soccermatics.tags import encode, has_tags
+
+events = load_events('England')
+shots = events.loc[events['eventName'] == 'Shot']
+
+LEFT_FOOT = {'id': 401}
+GOAL = {'id': 101}
+ACCURATE = {'id': 1801}
+
+filters = {
+    'left foot shots': (shots, lambda df: df.apply(lambda event: LEFT_FOOT in event.tags, axis=1), ('left_foot',)),
+    'goals': (shots, lambda df: df.apply(lambda event: GOAL in event.tags, axis=1), ('goal',)),
+    'accurate events': (events, lambda df: df.apply(lambda event: ACCURATE in event.tags, axis=1), ('accurate',)),
+    'accurate left foot shots': (shots, lambda df: df.apply(lambda event: LEFT_FOOT in event.tags and ACCURATE in event.tags, axis=1), ('left_foot', 'accurate')),
+}
+
+# %% codecell
+for name, (df, apply_filter, tags) in filters.items():
+    # both versions must select the same events
+    assert (apply_filter(df).to_numpy() == has_tags(df, *tags)).all()
+    apply_time = min(timeit.repeat(lambda: apply_filter(df), number=1, repeat=3))
+    mask_time = min(timeit.repeat(lambda: has_tags(df, *tags), number=10, repeat=3)) / 10
+    print(f'{name} ({len(df)} rows): apply {apply_time * 1000:.1f}ms, bitmask {mask_time * 1000:.3f}ms, {apply_time / mask_time:.0f}x faster')
+
+# %% codecell
+# one-off cost of decoding the tags, paid when the cache is built
+decode_time = min(timeit.repeat(lambda: encode(events['tags']), number=1, repeat=3))
+print(f'decoding the tags of {len(events)} events took {decode_time * 1000:.1f}ms')
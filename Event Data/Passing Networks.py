@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from mplsoccer import Pitch, Sbopen
-
-parser = Sbopen()
+from mplsoccer import Pitch
+from soccermatics.dimensions import statsbomb_players
+from soccermatics.networks import LivePassingNetwork, adjacency_matrices, goalkeepers, passing_metrics, passing_network
+from soccermatics.query import EventQuery
+from soccermatics.statsbomb import EventStore
+from soccermatics.xt import statsbomb_expected_threat
+
+# same interface as Sbopen, but the parsed match is cached locally after the first download
+parser = EventStore()
 df, related, freeze, tactics = parser.event(69301)
 
 # %% markdown
@@ -13,14 +19,22 @@ df, related, freeze, tactics = parser.event(69301)
 
 # %% codecell
 # check for inedx of first substitution
-sub = df.loc[(df['type_name'] == 'Substitution') & (df['team_name'] == "England Women's")].iloc[0]['index']
+events = EventQuery(df)
+sub = events.where(type='Substitution', team="England Women's").iloc[0]['index']
 # mask for England's successful passes (assuming unsuccesful passes not recorded in pass data)
-mask_england = (df.type_name == 'Pass') & (df.team_name == "England Women's") & (df.index < sub) & (df.outcome_name.isnull()) & (df.sub_type_name != 'Throw-in')
+mask_england = events.mask(type='Pass', team="England Women's", successful=True, exclude_sub='Throw-in') & (df.index < sub)
 england_passes = df.loc[mask_england, ['x','y','end_x','end_y','player_name','pass_recipient_name']]
 
-# only want to display player surnames
-england_passes['surname'] = england_passes['player_name'].apply(lambda x: x.split()[-1])
-england_passes['pass_recipient_surname'] = england_passes['pass_recipient_name'].apply(lambda x: x.split()[-1])
+# expected threat added by each pass, from an xT grid fitted on the whole tournament and cached after the first fit
+xt_model = statsbomb_expected_threat(parser, competition_id=72, season_id=30)
+england_passes['xt'] = xt_model.move_value(df.loc[mask_england], provider='statsbomb')
+
+# only want to display player surnames, players sharing a surname keep their full name
+# the labels are looked up by player id, so two players with the same name stay apart
+players = statsbomb_players(df)
+surnames = players.short_names()
+england_passes['surname'] = df.loc[mask_england, 'player_id'].map(surnames)
+england_passes['pass_recipient_surname'] = df.loc[mask_england, 'pass_recipient_id'].map(surnames)
 
 # %% markdown
 # ### Calculating vertices size and location
@@ -28,21 +42,11 @@ england_passes['pass_recipient_surname'] = england_passes['pass_recipient_name']
 # Calculate the vertice size to be proportional to the number of passes.
 
 # %% codecell
-# group by passer and reciever
-pass_location = england_passes.groupby('surname').mean()
-recieve_location = england_passes.groupby('pass_recipient_surname').mean()
-
-# calculate pass counts
-pass_count = england_passes.groupby('surname').count().iloc[:,1].rename('pass_count')
-
-# join into one dataframe
-mean_location = pass_location.join(recieve_location, on=None, how='inner', rsuffix='_recieve')
-mean_location = mean_location.join(pass_count, on=None, how='inner').reset_index()
-
-# calculate average of passing position and recieving position for each player
+# passing_network averages the passing position and recieving position for each player
 # this give an idea of average position while participating in the passing network
-mean_location['mean_x'] = mean_location[['x','end_x_recieve']].mean(axis=1)
-mean_location['mean_y'] = mean_location[['y','end_y_recieve']].mean(axis=1)
+# it also returns the edges between players, see the next section
+nodes, edges = passing_network(england_passes, passer='surname', recipient='pass_recipient_surname')
+mean_location = nodes.rename(columns={'player': 'surname', 'x': 'mean_x', 'y': 'mean_y'})
 
 # normalize vertice size
 mean_location['vertice_size'] = mean_location['pass_count'] / mean_location['pass_count'].max() * 1500
@@ -53,9 +57,8 @@ mean_location['vertice_size'] = mean_location['pass_count'] / mean_location['pas
 # Set threshold ignoring players that made fewer than N number of passes.
 
 # %% codecell
-# NOTE create a key-pair column by sorting by each key (surnames) and combining them into one
-england_passes['pair_key'] = england_passes.apply(lambda x: "_".join(sorted([x.surname, x.pass_recipient_surname])), axis=1)
-passing_pairs = england_passes.groupby('pair_key', as_index=False).count().iloc[:,:2].rename({'x':'pass_count'}, axis=1)
+# the edges are counted for each pair of players regardless of direction, and carry the positions of both players
+passing_pairs = edges.copy()
 passing_pairs['line_width'] = passing_pairs['pass_count'] / passing_pairs['pass_count'].max() * 10
 passing_pairs = passing_pairs.loc[passing_pairs['pass_count'] > 2]
 
@@ -76,15 +79,9 @@ for player in mean_location.itertuples():
     pitch.annotate(player.surname, xy=(player.mean_x,player.mean_y), zorder=3, c='black',
                     va='center', ha='center', weight='bold', size=16, ax=ax['pitch'])
 
-for pair in passing_pairs.itertuples():
-    players = pair.pair_key.split("_")
-    passer = players[0]
-    recipient = players[1]
-    passer_x = mean_location.loc[mean_location['surname'] == passer].mean_x.iloc[0]
-    passer_y = mean_location.loc[mean_location['surname'] == passer].mean_y.iloc[0]
-    recipient_x = mean_location.loc[mean_location['surname'] == recipient].mean_x.iloc[0]
-    recipient_y = mean_location.loc[mean_location['surname'] == recipient].mean_y.iloc[0]
-    pitch.lines(passer_x, passer_y, recipient_x, recipient_y, alpha=1, lw=pair.line_width, zorder=1, color='red', ax=ax['pitch'])
+# all edges in one call, the line widths are per edge
+pitch.lines(passing_pairs.x, passing_pairs.y, passing_pairs.end_x, passing_pairs.end_y, alpha=1, lw=passing_pairs.line_width,
+            zorder=1, color='red', ax=ax['pitch'])
 
 fig.suptitle("England Passing Network against Sweden", fontsize = 30)
 plt.show()
@@ -97,7 +94,8 @@ plt.show()
 # Using individual pass maps will give a more accurate depiction of where each player passes the ball.
 
 # %% codecell
-directed_pairs = england_passes.groupby(['surname', 'pass_recipient_surname'], as_index=False).count().iloc[:,:3].rename({'x':'pass_count'}, axis=1)
+nodes, directed_edges = passing_network(england_passes, passer='surname', recipient='pass_recipient_surname', directed=True)
+directed_pairs = directed_edges.rename(columns={'passer': 'surname', 'recipient': 'pass_recipient_surname'})
 directed_pairs['arrow_width'] = directed_pairs['pass_count'] / directed_pairs['pass_count'].max() * 20
 
 pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
@@ -109,17 +107,15 @@ for player in mean_location.itertuples():
     pitch.annotate(player.surname, xy=(player.mean_x,player.mean_y), zorder=4, c='black',
                     va='center', ha='center', weight='bold', size=16, ax=ax)
 
-for passer in directed_pairs.itertuples():
-    passer_x = mean_location.loc[mean_location['surname'] == passer.surname].mean_x.iloc[0]
-    passer_y = mean_location.loc[mean_location['surname'] == passer.surname].mean_y.iloc[0]
-    recipient_x = mean_location.loc[mean_location['surname'] == passer.pass_recipient_surname].mean_x.iloc[0]
-    recipient_y = mean_location.loc[mean_location['surname'] == passer.pass_recipient_surname].mean_y.iloc[0]
-    # NOTE Indicates direction of the pass between players only. Actual direction of passing is uncertain because player position is
-    #      mean position when making or recieving a pass.
-    if (passer_x < recipient_x):
-        forward = pitch.lines(passer_x, passer_y, recipient_x, recipient_y, alpha=0.5, lw=passer.arrow_width, zorder=2, color='yellow', label='Forward Pass', ax=ax)
-    else:
-        backward = pitch.lines(passer_x, passer_y, recipient_x, recipient_y, alpha=1, lw=passer.arrow_width, zorder=1, color='maroon', label='Backward Pass', ax=ax)
+# NOTE Indicates direction of the pass between players only. Actual direction of passing is uncertain because player position is
+#      mean position when making or recieving a pass.
+is_forward = directed_pairs.x < directed_pairs.end_x
+forward_pairs = directed_pairs.loc[is_forward]
+backward_pairs = directed_pairs.loc[~is_forward]
+forward = pitch.lines(forward_pairs.x, forward_pairs.y, forward_pairs.end_x, forward_pairs.end_y, alpha=0.5, lw=forward_pairs.arrow_width,
+                      zorder=2, color='yellow', label='Forward Pass', ax=ax)
+backward = pitch.lines(backward_pairs.x, backward_pairs.y, backward_pairs.end_x, backward_pairs.end_y, alpha=1, lw=backward_pairs.arrow_width,
+                       zorder=1, color='maroon', label='Backward Pass', ax=ax)
 
 plt.title("England Passing Network against Sweden")
 plt.legend(handles=[backward, forward])
@@ -135,20 +131,17 @@ plt.show()
 # Grund, Thomas U. “Network structure and team performance: The case of English Premier League soccer teams.” Social Networks 34.4 (2012): 682–690.
 
 # %% codecell
-def centralisation(passing_data, players=11):
-    max_passes = max(passing_data)
-    numerator = (max_passes - passing_data).sum()
-    denominator = (players-1) * pass_count.sum()
-    centralisation_index = numerator / denominator
-    return centralisation_index
-
-centralisation_index = centralisation(pass_count)
-print("Centralisation index is ", centralisation_index)
+# passing_metrics works on the pass counts between players held as an adjacency matrix,
+# for one network here, or for every team in every match at once with by=['match_id', 'team_name']
+N = 11 # number of players
+# goalkeepers are looked up from the event positions rather than hard-coded
+keepers = goalkeepers(df, player='player_id').map(surnames)
+metrics = passing_metrics(england_passes, by=(), passer='surname', recipient='pass_recipient_surname', players=N).iloc[0]
+metrics_no_keeper = passing_metrics(england_passes, by=(), passer='surname', recipient='pass_recipient_surname', players=N,
+                                    exclude=keepers).iloc[0]
 
-pairs = england_passes.groupby('pair_key', as_index=False).count().iloc[:,:2].rename({'x':'pass_count'}, axis=1)
-pairs_no_keeper = pairs.loc[pairs['pair_key'].str.contains('Telford') == False]
-centralisation_no_keeper = centralisation(pairs_no_keeper.pass_count, 10)
-print("Centralisation index excluding the goalkeeper is ", centralisation_no_keeper)
+print("Centralisation index is ", metrics.centralisation)
+print("Centralisation index excluding the goalkeeper is ", metrics_no_keeper.centralisation)
 
 # %% markdown
 # ### Network Density
@@ -156,47 +149,55 @@ print("Centralisation index excluding the goalkeeper is ", centralisation_no_kee
 # Literature states teams with more dense networks tend to perform better.
 # I will look at the networks both including and excluding the goalkeeper.
 # ## Directed Network
+# The directed potential network has N*(N-1) links, or (N-1)*(N-2) without the goalkeeper.
 
 # %% codecell
-N = 11 # number of players
-
-# Directed Potential Network Density
-fully_connected = N*(N-1)
-field_10 = (N-1)*(N-2)
-directed_pairs = england_passes.groupby(['surname', 'pass_recipient_surname'], as_index=False).count().iloc[:,:3].rename({'x':'pass_count'}, axis=1)
-density = directed_pairs.pass_count.count()/fully_connected
-
-exclude_keeper = directed_pairs.loc[(directed_pairs['surname'] != 'Telford') & (directed_pairs['pass_recipient_surname'] != 'Telford')]
-field_10_density = exclude_keeper.pass_count.count()/field_10
-
-print(f"Directed network density is: {density}")
-print(f"Directed network density without the goalkeeper is: {field_10_density}")
+print(f"Directed network density is: {metrics.directed_density}")
+print(f"Directed network density without the goalkeeper is: {metrics_no_keeper.directed_density}")
 
 # %% markdown
 # ## Undirected Network
+# The undirected potential network has half as many links as the directed one.
 
 # %% codecell
-# Undirected Potential Network Density
-fully_connected = directed_fully_connected/2
-field_10 = directed_no_goalkeeper/2
-undirected_pairs = england_passes.groupby('pair_key', as_index=False).count().iloc[:,:2].rename({'x':'pass_count'}, axis=1)
-density = undirected_pairs.pass_count.count()/fully_connected
-
-exclude_keeper = undirected_pairs.loc[undirected_pairs['pair_key'].str.contains('Telford') == False]
-field_10_density = exclude_keeper.pass_count.count() / field_10
-
-print(f"Undirected network density is: {density}")
-print(f"Undirected network density without the goalkeeper is: {field_10_density}")
+print(f"Undirected network density is: {metrics.undirected_density}")
+print(f"Undirected network density without the goalkeeper is: {metrics_no_keeper.undirected_density}")
 
 # %% markdown
 # ### Who is the Hub
 # Which player(s) is the most connected passer?
 
 # %% codecell
-passing_involvments = {}
-for player in directed_pairs.surname.unique():
-    passing_involvments.update({player:directed_pairs.loc[(directed_pairs['surname'] == player) | (directed_pairs['pass_recipient_surname'] == player)].pass_count.sum()})
+# passes made plus passes recieved by each player, from the adjacency matrix
+groups, names, counts = adjacency_matrices(england_passes, by=(), passer='surname', recipient='pass_recipient_surname')
+passing_involvments = dict(zip(names[0], (counts[0].sum(axis=0) + counts[0].sum(axis=1)).tolist()))
 print(f"Passing involvments by each player {passing_involvments}")
+print(f"The hub is {metrics.hub} with {metrics.hub_involvements} passing involvments")
+
+# %% markdown
+# ### Threat added by each passer
+# Counting passes treats a square pass in midfield like a pass into the box.
+# The xT column values each pass by how much it raised the chance of scoring.
+
+# %% codecell
+threat = england_passes.groupby('surname')['xt'].agg(['sum', 'mean', 'size']).sort_values('sum', ascending=False)
+print(threat.round(3))
+
+# %% markdown
+# ### Passes in possessions that end in a shot
+# Passes are not independent, each belongs to a possession chain of one team.
+# possession_chains numbers the chains and labels each with its outcome.
+
+# %% codecell
+from soccermatics.possessions import possession_chains
+
+chained, chains = possession_chains(df, 'statsbomb')
+england_passes['chain_outcome'] = chained.loc[england_passes.index, 'chain_outcome']
+shot_chain_share = (england_passes['chain_outcome'] != 'turnover').groupby(england_passes['surname']).mean()
+print(shot_chain_share.sort_values(ascending=False).round(2))
+# the events of every chain ending in a shot, in event order, as one slice of the chains
+shot_chain_events = df.iloc[chains.rows(chains.where('shot'))]
+print(f"{len(chains.where('shot'))} chains ended in a shot without a goal, {len(chains.where('goal'))} in a goal")
 
 # %% markdown
 # ### Challenge
@@ -206,25 +207,14 @@ print(f"Passing involvments by each player {passing_involvments}")
 # filter forward passes
 forward_passes = england_passes.loc[england_passes['x'] < england_passes['end_x']]
 
-forward_pass_location = forward_passes.groupby('surname').mean()
-forward_recieve_location = forward_passes.groupby('pass_recipient_surname').mean()
-
-# calculate pass counts
-forward_pass_count = forward_passes.groupby('surname').count().iloc[:,1].rename('pass_count')
-
-# join into one dataframe
-forward_mean_location = forward_pass_location.join(recieve_location, on=None, how='inner', rsuffix='_recieve')
-forward_mean_location = forward_mean_location.join(pass_count, on=None, how='inner').reset_index()
-
-# calculate average of passing position and recieving position for each player
-# this give an idea of average position while participating in the passing network
-forward_mean_location['mean_x'] = forward_mean_location[['x','end_x_recieve']].mean(axis=1)
-forward_mean_location['mean_y'] = forward_mean_location[['y','end_y_recieve']].mean(axis=1)
+# average positions and edges of the network made of forward passes only
+forward_nodes, forward_edges = passing_network(forward_passes, passer='surname', recipient='pass_recipient_surname')
+forward_mean_location = forward_nodes.rename(columns={'player': 'surname', 'x': 'mean_x', 'y': 'mean_y'})
 
 # normalize vertice size
 forward_mean_location['vertice_size'] = forward_mean_location['pass_count'] / forward_mean_location['pass_count'].max() * 1500
 
-forward_passing_pairs = forward_passes.groupby('pair_key', as_index=False).count().iloc[:,:2].rename({'x':'pass_count'}, axis=1)
+forward_passing_pairs = forward_edges.copy()
 forward_passing_pairs['line_width'] = forward_passing_pairs['pass_count'] / forward_passing_pairs['pass_count'].max() * 10
 #forward_passing_pairs = forward_passing_pairs.loc[forward_passing_pairs['pass_count'] > 2]
 
@@ -237,16 +227,34 @@ for player in forward_mean_location.itertuples():
     pitch.annotate(player.surname, xy=(player.mean_x,player.mean_y), zorder=4, c='black',
                     va='center', ha='center', weight='bold', size=16, ax=ax)
 
-for pair in forward_passing_pairs.itertuples():
-    players = pair.pair_key.split("_")
-    passer = players[0]
-    recipient = players[1]
-    passer_x = forward_mean_location.loc[forward_mean_location['surname'] == passer].mean_x.iloc[0]
-    passer_y = forward_mean_location.loc[forward_mean_location['surname'] == passer].mean_y.iloc[0]
-    recipient_x = forward_mean_location.loc[forward_mean_location['surname'] == recipient].mean_x.iloc[0]
-    recipient_y = forward_mean_location.loc[forward_mean_location['surname'] == recipient].mean_y.iloc[0]
-    pitch.lines(passer_x, passer_y, recipient_x, recipient_y, alpha=1, lw=pair.line_width, zorder=1, color='red', ax=ax)
+pitch.lines(forward_passing_pairs.x, forward_passing_pairs.y, forward_passing_pairs.end_x, forward_passing_pairs.end_y,
+            alpha=1, lw=forward_passing_pairs.line_width, zorder=1, color='red', ax=ax)
 
 
 plt.title("England Passing Network against Sweden With Forward Passes Only")
 plt.show()
+
+# %% markdown
+# ### Updating the network during the match
+# Instead of cutting the events at the first substitution and rebuilding everything, feed the events to a
+# LivePassingNetwork as they happen. Each pass updates the network in constant time, and the network of any
+# time window, or of each segment between substitutions, is available at any point.
+
+# %% codecell
+live = LivePassingNetwork("England Women's")
+# replay the match in batches of 100 events, like a live feed
+for start in range(0, len(df), 100):
+    live.update(df.iloc[start:start + 100])
+
+first_segment_nodes, first_segment_edges = live.segments()[0]
+last_15_nodes, last_15_edges = live.last(minutes=15)
+print(f"{len(live.segments())} segments, {len(first_segment_edges)} edges before the first substitution")
+
+pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
+fig, ax = pitch.draw(figsize=(20,14))
+pitch.scatter(last_15_nodes.x, last_15_nodes.y, s=last_15_nodes.pass_count / last_15_nodes.pass_count.max() * 1500, zorder=3,
+                color='gold', linewidth=1, alpha=1, ax=ax)
+pitch.lines(last_15_edges.x, last_15_edges.y, last_15_edges.end_x, last_15_edges.end_y,
+            alpha=1, lw=last_15_edges.pass_count / last_15_edges.pass_count.max() * 10, zorder=1, color='red', ax=ax)
+plt.title("England Passing Network against Sweden, last 15 minutes")
+plt.show()
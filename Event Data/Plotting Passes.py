@@ -5,11 +5,21 @@
 # importing necessary libraries
 import matplotlib.pyplot as plt
 import numpy as np
-from mplsoccer import Pitch, Sbopen
+from mplsoccer import Pitch
+from soccermatics.query import EventQuery
+from soccermatics.statsbomb import EventStore
+from soccermatics.xt import statsbomb_expected_threat
 
-parser = Sbopen()
-df, related, freeze, tactics = parser.event(69301)
-passes = df.loc[(df['type_name'] == 'Pass') & (df['sub_type_name'] != 'Throw-in')].set_index('id')
+# same interface as Sbopen, but the parsed match is cached locally after the first download
+parser = EventStore()
+# only the passes and the columns used below are read from the cache, the related, freeze and tactics tables are skipped
+df = parser.scan([69301], ['id', 'match_id', 'type_name', 'sub_type_name', 'outcome_name', 'team_name',
+                           'player_name', 'x', 'y', 'end_x', 'end_y'], [('type_name', '==', 'Pass')])
+# the masks of the queries below are computed once and shared between the cells
+events = EventQuery(df)
+passes = events.where(type='Pass', exclude_sub='Throw-in').set_index('id')
+# expected threat added by each pass, from an xT grid fitted on the whole tournament and cached after the first fit
+passes['xt'] = statsbomb_expected_threat(parser, competition_id=72, season_id=30).move_value(passes, provider='statsbomb')
 
 # %% markdown
 # ### Plotting passes iteratively
@@ -44,7 +54,7 @@ plt.show()
 # Plotting all passes at once without a for loop.
 
 # %% codecell
-mask_bronze = (df.type_name == 'Pass') & (df.player_name == "Lucy Bronze")
+mask_bronze = events.mask(type='Pass', player="Lucy Bronze")
 df_pass = df.loc[mask_bronze, ['x', 'y', 'end_x', 'end_y']]
 
 pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
@@ -58,12 +68,15 @@ plt.show()
 # ### Plotting multiuple pass maps on one figure
 
 # %% codecell
-mask_england = (df.type_name == 'Pass') & (df.type_name == 'Pass') & (df.team_name == "England Women's") & (df.sub_type_name != "Throw-in")
+mask_england = events.mask(type='Pass', team="England Women's", exclude_sub="Throw-in")
 df_passes = df.loc[mask_england, ['x', 'y', 'end_x', 'end_y', 'player_name']]
 names = df_passes['player_name'].unique()
 
+# size the grid to the number of players
+ncols = 4
+nrows = int(np.ceil(len(names) / ncols))
 pitch = Pitch(line_color='black', pad_top=20)
-fig, axs = pitch.grid(ncols=4, nrows=4, grid_height=0.85, title_height=0.06, axis=False,
+fig, axs = pitch.grid(ncols=ncols, nrows=nrows, grid_height=0.85, title_height=0.06, axis=False,
                     endnote_height=0.04, title_space=0.04, endnote_space=0.01)
 
 # plot pass map for each player
@@ -74,9 +87,48 @@ for player, ax in zip(names, axs['pitch'].flat[:len(names)]):
     pitch.arrows(player_df.x, player_df.y, player_df.end_x, player_df.end_y, color='blue', ax=ax, width=1)
 
 # remove extra axes
-for ax in axs['pitch'][-1, 16 - len(names):]:
+for ax in axs['pitch'].flat[len(names):]:
     ax.remove()
 
 #Another way to set title using mplsoccer
 axs['title'].text(0.5, 0.5, 'England passes against Sweden', ha='center', va='center', fontsize=30)
 plt.show()
+
+# %% markdown
+# ### Pass map grids for every team
+# save_pass_grids renders the same grid for every team in a process pool with the Agg backend,
+# straight to PNG files. The pitch is rendered once per process and reused by every panel.
+
+# %% codecell
+from soccermatics.plotting import save_pass_grids
+import os
+
+mask_passes = events.mask(type='Pass', exclude_sub="Throw-in")
+# the pool starts new Python processes on macOS and Windows, which import this script again,
+# so the grids are only rendered when the script is run directly
+if __name__ == '__main__':
+    timings = save_pass_grids(df.loc[mask_passes, ['match_id', 'team_name', 'x', 'y', 'end_x', 'end_y', 'player_name']],
+                              os.path.join(os.getcwd(), 'output', 'pass_grids'))
+    print(timings)
+
+# %% markdown
+# ### Pass heatmaps
+# Over a season single passes become unreadable, so the start locations are binned instead.
+# HeatmapStore keeps the counts of every player in one array, a heatmap is a row of it,
+# and the passes of more matches can be added with update().
+
+# %% codecell
+from soccermatics.heatmaps import HeatmapStore, positional_grid
+from soccermatics.normalize import metric_pitch, normalize
+
+passes_metric = normalize(df.loc[mask_passes], 'statsbomb')
+players = HeatmapStore(positional_grid(), by='player_name').update(passes_metric)
+
+pitch = metric_pitch(line_color='white', positional=True, positional_color='white')
+fig, axs = pitch.grid(ncols=2, grid_height=0.85, title_height=0.06, axis=False, endnote_height=0.04)
+for ax, player in zip(axs['pitch'], ['Lucy Bronze', 'Sara Caroline Seger']):
+    stats = players.grid.bin_statistic(players.heatmap(player, normalize=True), pitch)
+    pitch.heatmap(stats, ax=ax, cmap='Blues', edgecolor='white')
+    ax.set_title(player, fontsize=16)
+axs['title'].text(0.5, 0.5, 'Share of passes started in each zone', ha='center', va='center', fontsize=20)
+plt.show()
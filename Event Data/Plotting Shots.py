@@ -1,16 +1,21 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from mplsoccer import Pitch, VerticalPitch, Sbopen
+from soccermatics.normalize import PITCH_LENGTH, PITCH_WIDTH, metric_pitch, normalize
+from soccermatics.plotting import shot_map
+from soccermatics.statsbomb import EventStore
+from soccermatics.xg import fit_wyscout
 
 # %% markdown
 # ### Opening the dataset.
 
 # %% codecell
-# Statsbomb parser
-parser = Sbopen()
-# get match from match id
-df, related, freeze, tactics = parser.event(69301)
+# Statsbomb parser, same interface as Sbopen but the parsed match is cached locally after the first download
+parser = EventStore()
+# get match from match id, without the related, freeze and tactics tables this script doesn't use
+df, = parser.event(69301, tables=('event',))
+# coordinates in metres on a 105x68 pitch, the same for StatsBomb and Wyscout events
+df = normalize(df, 'statsbomb')
 team1, team2 = df.team_name.unique()
 shots = df.loc[df['type_name'] == 'Shot'].set_index('id')
 
@@ -22,7 +27,8 @@ shots = df.loc[df['type_name'] == 'Shot'].set_index('id')
 shots.info()
 shots.head()
 shots.describe()
-shots.describe(include='object')
+# the names are categoricals, see soccermatics.schema
+shots.describe(include=['category', 'object'])
 
 # %% markdown
 # ### Making shot map.
@@ -31,9 +37,7 @@ shots.describe(include='object')
 # but iterating through dataframe rows is usually inefficient.
 
 # %% codecell
-pitch_length = 120 # x
-pitch_width = 80 # y
-pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box', pitch_length=pitch_length, pitch_width=pitch_width)
+pitch = metric_pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
 fig, ax = pitch.draw(figsize=(10,7))
 
 #set circlesize
@@ -55,10 +59,10 @@ for shot in shots.itertuples():
     #plot Sweden
     else:
         if goal:
-            shot_circle=plt.Circle((pitch_length-x,pitch_width-y),circle_size,color="blue")
-            plt.text(pitch_length-x+1,pitch_width-y-2 ,shot.player_name)
+            shot_circle=plt.Circle((PITCH_LENGTH-x,PITCH_WIDTH-y),circle_size,color="blue")
+            plt.text(PITCH_LENGTH-x+1,PITCH_WIDTH-y-2 ,shot.player_name)
         else:
-            shot_circle=plt.Circle((pitch_length-x,pitch_width-y),circle_size,color="blue")
+            shot_circle=plt.Circle((PITCH_LENGTH-x,PITCH_WIDTH-y),circle_size,color="blue")
             shot_circle.set_alpha(.2)
     ax.add_patch(shot_circle)
 fig
@@ -73,7 +77,7 @@ plt.show()
 
 # %% codecell
 # create pitch
-pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box', pitch_length=pitch_length, pitch_width=pitch_width)
+pitch = metric_pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
 fig, ax = pitch.grid(grid_height=0.9, title_height=0.06, axis=False, endnote_height=0.04, title_space=0, endnote_space=0)
 
 # query
@@ -81,22 +85,12 @@ mask_england = (df.type_name == 'Shot') & (df.team_name == team1)
 # finding rows in the df and keeping only necessary columns
 df_england = df.loc[mask_england, ['x', 'y', 'outcome_name', 'player_name']]
 
-for shot in df_england.itertuples():
-    if shot.outcome_name == 'Goal':
-        pitch.scatter(shot.x, shot.y, alpha=1, s=500, color='red', ax=ax['pitch'])
-        pitch.annotate(shot.player_name, (shot.x + 1, shot.y - 2), ax=ax['pitch'], fontsize=12)
-    else:
-        pitch.scatter(shot.x, shot.y, alpha=0.2, s=500, color='red', ax=ax['pitch'])
-
-mask_sweden = (df.type_name == 'Shot') & (df.team_name == team2)
-mask_sweden = df.loc[mask_sweden, ['x', 'y', 'outcome_name', 'player_name']]
+# xG of every shot from a model fitted on all the Wyscout shots in data/Wyscout, scored in one matrix product
+shots['xg'] = fit_wyscout().score(shots)
 
-for shot in mask_sweden.itertuples():
-    if shot.outcome_name == 'Goal':
-        pitch.scatter(pitch_length-shot.x, pitch_width-shot.y, alpha=1, s=500, color='blue', ax=ax['pitch'])
-        pitch.annotate(shot.player_name, (pitch_length - shot.x + 1, pitch_width - shot.y - 2), ax=ax['pitch'], fontsize=12)
-    else:
-        pitch.scatter(pitch_length - shot.x, pitch_width - shot.y, alpha=0.2, s=500, color='blue', ax=ax['pitch'])
+# shot_map mirrors Sweden's shots in one array operation and draws one scatter per team and outcome
+# instead of one per shot, only the goals are annotated. The markers are sized by xG.
+shot_map(shots, pitch, ax['pitch'], teams=[team1, team2], size='xg', scale=2000)
 
 fig.suptitle("England (red) and Sweden (blue) shots", fontsize = 30)
 plt.show()
@@ -106,7 +100,7 @@ plt.show()
 #
 
 # %% codecell
-pitch = VerticalPitch(pitch_color='grass', line_color='white', goal_type='box', stripe=True, half=True)
+pitch = metric_pitch(vertical=True, pitch_color='grass', line_color='white', goal_type='box', stripe=True, half=True)
 fig, ax = pitch.grid(grid_height=0.9, title_height=0.06, axis=False,
                      endnote_height=0.04, title_space=0, endnote_space=0)
 
@@ -123,7 +117,7 @@ plt.show()
 # 4. Plot arrows to show where the passes went to.
 
 # %% codecell
-pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box', pitch_length=pitch_length, pitch_width=pitch_width)
+pitch = metric_pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
 fig, ax = pitch.draw(figsize=(20,14))
 
 passes = df.loc[df['type_name'] == 'Pass']
@@ -145,7 +139,7 @@ plt.show()
 # ### Challenge done non-iteratively (No for-loop).
 # %% codecell
 
-pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box', pitch_length=pitch_length, pitch_width=pitch_width)
+pitch = metric_pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
 fig, ax = pitch.draw(figsize=(20,14))
 
 seger_mask = (df.type_name == 'Pass') & (df.player_name == 'Sara Caroline Seger')
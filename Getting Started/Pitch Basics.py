@@ -38,3 +38,18 @@ fig, ax = pitch.draw()
 # You can also adjust the transparency via shade_alpha and positional_alpha.
 pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box', positional=True, shade_middle=True, positional_linestyle='--', positional_color='white', shade_color='#d9e829')
 fig, ax = pitch.draw()
+
+# NOTE
+# Scripts that draw the same pitch in many figures can reuse a pre-rendered background.
+# pitch_figure takes the same arguments as the Pitch constructor plus the figure size, renders the pitch
+# the first time and keeps it in memory and in data/.cache/pitches, later figures only draw the data on top.
+# The figure is not registered with pyplot, so plt.show() skips it: it is saved to output/ instead,
+# and a notebook shows it as the value of the cell.
+import os
+from soccermatics.pitches import pitch_figure
+
+pitch, fig, ax = pitch_figure(figsize=(8, 5.5), pitch_color='grass', line_color='white', stripe=True)
+pitch.scatter([60, 100], [40, 30], s=200, color='red', ax=ax)
+os.makedirs('output', exist_ok=True)
+fig.savefig(os.path.join('output', 'pitch_figure.png'))
+fig
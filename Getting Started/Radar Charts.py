@@ -1,2 +1,38 @@
-from mplsoccer import Radar, FontManager, grid
-import matplotlib.pyplot as plt
+# %% markdown
+# ### Radar charts of per 90 percentiles.
+# We compute per 90 metrics for every player in the 2017/18 Premier League
+# from the Wyscout events, rank them against the league and draw radars.
+
+# %% codecell
+from soccermatics.radar import load_percentiles, radar_figure, save_radars
+from soccermatics.wyscout import load_players
+
+# per 90 metrics and percentile ranks of every player with at least 900 minutes
+# the first run builds them from the events and caches them, later runs read the cache
+percentiles = load_percentiles('England', min_minutes=900)
+players = load_players()
+names = players.set_index('wyId')['shortName'].to_dict()
+percentiles.head()
+
+# %% markdown
+# ### One radar.
+# The fonts are downloaded once to data/fonts and loaded once per process.
+
+# %% codecell
+params = ['Shots', 'Goals', 'Assists', 'Key Passes', 'Passes', 'Pass Accuracy',
+          'Crosses', 'Take Ons', 'Duels Won', 'Interceptions']
+player_id = percentiles['Goals'].idxmax()
+values = percentiles.loc[player_id, [f'{param} percentile' for param in params]].to_numpy()
+fig = radar_figure(names.get(player_id, str(player_id)), values, params)
+fig
+
+# %% markdown
+# ### A radar for every player.
+# The radars are drawn in worker processes, each writes its PNGs to output/radars.
+# The workers are new Python processes on macOS and Windows that import this script again,
+# so they are only started when the script is run directly.
+
+# %% codecell
+if __name__ == '__main__':
+    count, seconds = save_radars(percentiles, names, 'output/radars', params=params)
+    print(f'{count} radars drawn in {seconds:.1f}s')
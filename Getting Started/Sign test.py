@@ -3,21 +3,17 @@
 # We will use 2017/18 Premiere League season data.
 
 # %% codecell
-import pandas as pd
-import os
+from soccermatics.wyscout import load_events, load_players
 
-# get current working directory
-cwd = os.getcwd()
-
-# import event data
-path = os.path.join(cwd, 'data', 'Wyscout', 'events', 'events_England.json')
-with open(path) as f:
-    train = pd.read_json(f)
+# import event data from data/Wyscout in the current working directory
+# the first run parses the JSON and caches it, later runs memory map the cache
+# only the columns used below are read, the nested tags and positions lists are the slowest to convert
+# and are already decoded into the tag_mask and x, y columns
+train = load_events('England', columns=['id', 'matchId', 'eventName', 'subEventName', 'playerId', 'teamId',
+                                        'tag_mask', 'x', 'y'])
 
 # import player data
-path = os.path.join(cwd, 'data', 'Wyscout', 'players.json')
-with open(path) as f:
-    players = pd.read_json(f)
+players = load_players()
 
 # see what the data looks like
 train.info()
@@ -35,17 +31,19 @@ players.head()
 # filter for shots
 shots = train.loc[train['eventName'] == 'Shot']
 
-# filter for Heung-Min Son
-son_id = players.loc[(players['shortName'] == 'Son Heung-Min')]["wyId"].iloc[0]
+# find Heung-Min Son's id, the name lookup ignores case, accents and the order of the names
+from soccermatics.dimensions import wyscout_players
+
+player_index = wyscout_players()
+son_id = player_index.id('Son Heung-Min')
 
-# Event tags
-LEFT_FOOT = {'id':401}
-RIGHT_FOOT = {'id': 402}
+# Event tags, decoded at load time into the tag_mask column (401 is left foot, 402 is right foot)
+from soccermatics.tags import has_tags
 
 # son's shots
 son_shots = shots.loc[shots['playerId'] == son_id]
-lefty_shots = son_shots.loc[son_shots.apply (lambda shot:LEFT_FOOT in shot.tags, axis = 1)]
-righty_shots = son_shots.loc[son_shots.apply (lambda shot:RIGHT_FOOT in shot.tags, axis = 1)]
+lefty_shots = son_shots.loc[has_tags(son_shots, 'left_foot')]
+righty_shots = son_shots.loc[has_tags(son_shots, 'right_foot')]
 
 # %% markdown
 # ### Performing the Sign Test.
@@ -68,3 +66,34 @@ if pvalue < alpha:
     print("P-value amounts to", str(pvalue)[:5], "- We reject null hypothesis - Heung-Min Son is not ambidextrous")
 else:
     print("P-value amounts to", str(pvalue)[:5], " - We do not reject null hypothesis - Heung-Min Son is ambidextrous")
+
+# %% markdown
+# ### Shot quality.
+# Counting shots treats a tap-in like a shot from 30 yards. Expected goals (xG) weighs each shot
+# by its chance of going in, from a logistic model fitted on all the Wyscout shots.
+
+# %% codecell
+from soccermatics.xg import fit_wyscout
+
+xg_model = fit_wyscout()
+son_xg = xg_model.score(son_shots, 'wyscout')
+print(f"left foot: {len(lefty_shots)} shots, {son_xg[lefty_shots.index].sum():.2f} xG")
+print(f"right foot: {len(righty_shots)} shots, {son_xg[righty_shots.index].sum():.2f} xG")
+
+# %% markdown
+# ### Screening every player.
+# The same test for every player with at least 10 left or right foot shots in all the Wyscout competitions.
+# The shots are counted per player in one pass and all p-values are computed at once.
+# Testing hundreds of players at alpha=0.05 would reject some of them by chance,
+# so the p-values are corrected with the Benjamini-Hochberg procedure.
+
+# %% codecell
+from soccermatics.wyscout import load_all_events
+from soccermatics.stats import footedness
+
+# the events are loaded in a process pool, which imports this script again in every worker on macOS and Windows
+if __name__ == '__main__':
+    all_events = load_all_events()
+    ranked = footedness(all_events, players, min_shots=10, alpha=alpha)
+    print(ranked.head(20))
+    print(f"{ranked['ambidextrous'].sum()} of {len(ranked)} players can not be said to prefer one foot")
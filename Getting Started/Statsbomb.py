@@ -1,8 +1,10 @@
 import pandas as pd
-#importing SBopen class from mplsoccer to open the data
-from mplsoccer import Sbopen
+#importing EventStore, which wraps the SBopen class from mplsoccer to open the data
+from soccermatics.statsbomb import EventStore
 # The first thing we have to do is open the data. We use a parser SBopen available in mplsoccer.
-parser = Sbopen()
+# EventStore has the same methods but caches every parsed frame in data/StatsBomb/.cache,
+# so later runs and other scripts don't download and parse the same match again.
+parser = EventStore()
 
 #opening data using competition method
 df_competition = parser.competition()
@@ -29,3 +31,16 @@ df_event.info()
 df_frame, df_visible = parser.frame(3788741)
 # exploring the data
 df_frame.info()
+
+# the frames as fixed-shape arrays, one row of player slots per event, cached next to the frame table
+from soccermatics.freeze_frames import load_freeze_frames
+frames = load_freeze_frames(parser, 3788741)
+print(frames.xy.shape)
+# defenders between the ball and the goal, distance to the nearest opponent and open passing lanes of every event
+frame_metrics = frames.metrics()
+frame_metrics.describe()
+
+# space controlled by the team on the ball at every event, by Voronoi regions and a time-to-intercept surface
+from soccermatics.pitch_control import load_pitch_control
+control_metrics, control_surface = load_pitch_control(parser, 3788741)
+control_metrics.describe()
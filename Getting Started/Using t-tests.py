@@ -3,50 +3,33 @@
 # We will use 2017/18 Premiere League season data.
 
 # %% codecell
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import os
-
-# %% codecell
-#open events
-# get current working directory
-cwd = os.getcwd()
-
-# import event data
-path = os.path.join(cwd, 'data', 'Wyscout', 'events', 'events_England.json')
-with open(path) as f:
-    events = pd.read_json(f)
-
-# import player data
-path = os.path.join(cwd, 'data', 'Wyscout', 'teams.json')
-with open(path) as f:
-    teams = pd.read_json(f)
-teams = teams.rename(columns={'wyId': 'teamId'})
+from soccermatics.aggregates import event_column, event_counts, load_team_match_counts, one_sample_ttest, pairwise_ttests, two_sample_ttest
+from soccermatics.stats import bootstrap_test, pairwise_resampling_tests, permutation_test
 
 # %% markdown
 # ### Preparing the data.
 # We will look at corners taken for each team.
+# The number of every event and sub event for each team in each match is counted once from
+# data/Wyscout/events/events_England.json and cached on disk, indexed by team and match.
+# Every test below is a lookup in this table, so trying another event or team doesn't go back to the raw events.
 
 # %% codecell
-# get corners
-corners = events[events["subEventName"] == 'Corner']
-# count corners by team
-corners_by_team = corners.groupby('teamId').size().reset_index(name='counts')
-# merge with team names
-summary = corners_by_team.merge(teams[['name', 'teamId']], how='left', on='teamId')
-# count corners by team by game
-corners_by_game = corners.groupby(['teamId', 'matchId']).size().reset_index(name='counts')
-summary2 = corners_by_game.merge(teams[['name', 'teamId']], how='left', on='teamId')
+counts = load_team_match_counts('England')
+# team names are resolved to their Wyscout ids once, the counts are then selected by id
+from soccermatics.dimensions import wyscout_teams
+
+teams = wyscout_teams()
 
 # %% markdown
 # ### One-sample one-sided t-test
 # Assume teams typically get 6 corners per game. Let's see if Man City, and attacking minded team, typically get more.
 
 # %% codecell
-from scipy.stats import ttest_1samp
 team_name = 'Manchester City'
-man_city_corners = summary2.loc[summary2['name'] == team_name]
+man_city = teams.id(team_name)
+man_city_corners = event_counts(counts, 'Corner', man_city)
 
 def FormatFigure(ax):
     ax.legend(loc='upper left')
@@ -60,15 +43,15 @@ def FormatFigure(ax):
 
 
 fig,ax1=plt.subplots(1,1)
-ax1.hist(man_city_corners.counts, np.arange(0.01,20.5,1), color='lightblue', edgecolor = 'white',linestyle='-',alpha=0.5, label=team_name, density=True,align='right')
+ax1.hist(man_city_corners, np.arange(0.01,20.5,1), color='lightblue', edgecolor = 'white',linestyle='-',alpha=0.5, label=team_name, density=True,align='right')
 FormatFigure(ax1)
 
-mean = man_city_corners.counts.mean()
-std = man_city_corners.counts.std()
+mean = man_city_corners.mean()
+std = man_city_corners.std()
 
 print('City typically had %.2f  plus/minus %.2f corners per match in the 2017/18 season.'%(mean,std))
 
-t, pvalue = ttest_1samp(man_city_corners.counts, popmean=6, alternative='greater')
+t, pvalue = one_sample_ttest(counts, 'Corner', man_city, popmean=6, alternative='greater')
 alpha = 0.05
 print("The t-staistic is %.2f and the P-value is %.2f."%(t,pvalue))
 if pvalue < alpha:
@@ -81,32 +64,59 @@ else:
 # We compare Liverpool and Everton in terms of corners per match.
 
 # %% codecell
-liverpool_corners = summary2.loc[summary2['name'] == 'Liverpool']
-everton_corners = summary2.loc[summary2['name'] == 'Everton']
+liverpool, everton = teams.ids(['Liverpool', 'Everton'])
+liverpool_corners = event_counts(counts, 'Corner', liverpool)
+everton_corners = event_counts(counts, 'Corner', everton)
 
-mean = liverpool_corners.counts.mean()
-std = liverpool_corners.counts.std()
+mean = liverpool_corners.mean()
+std = liverpool_corners.std()
 print("Liverpool typically had %.2f plus/minus %.2f corners per match in the 2017/18 season."%(mean,std))
 std_error=std/np.sqrt(len(liverpool_corners))
 print('The standard error in the number of corners per match is %.4f'%std_error)
 
-mean = everton_corners.counts.mean()
-std = everton_corners.counts.std()
+mean = everton_corners.mean()
+std = everton_corners.std()
 print('Everton typically had %.2f plus/minus %.2f corners per match in the 2017/18 season.'%(mean,std))
 std_error=std/np.sqrt(len(everton_corners))
 print('The standard error in the number of corners per match is %.4f'%std_error)
 
 fig,ax=plt.subplots(1,1)
-ax.hist(liverpool_corners.counts, np.arange(0.01,15.5,1), color='red', edgecolor = 'white',linestyle='-',alpha=1.0, label="Liverpool", density=True,align='right')
-ax.hist(everton_corners.counts, np.arange(0.01,15.5,1), alpha=0.25, color='blue', edgecolor = 'black', label='Everton',  density=True,align='right')
+ax.hist(liverpool_corners, np.arange(0.01,15.5,1), color='red', edgecolor = 'white',linestyle='-',alpha=1.0, label="Liverpool", density=True,align='right')
+ax.hist(everton_corners, np.arange(0.01,15.5,1), alpha=0.25, color='blue', edgecolor = 'black', label='Everton',  density=True,align='right')
 FormatFigure(ax)
 
-from scipy.stats import ttest_ind
-
-t, pvalue = ttest_ind(liverpool_corners.counts, everton_corners.counts, equal_var=False, alternative='two-sided')
+t, pvalue = two_sample_ttest(counts, 'Corner', liverpool, everton, equal_var=False, alternative='two-sided')
 alpha = 0.05
 print("The t-staistic is %.2f and the P-value is %.2f."%(t,pvalue))
 if pvalue < alpha:
     print("We reject null hypothesis - Liverpool took different number of corners per game than Everton")
 else:
     print("We cannot reject the null hypothesis that Liverpool took the same number of corners per game as Everton")
+
+# %% markdown
+# ### Comparing every pair of teams.
+# The same two-sample test for all pairs of teams in the league in one call.
+
+# %% codecell
+pairwise = pairwise_ttests(counts, 'Corner')
+print(pairwise.loc[pairwise['pvalue'] < alpha].sort_values('pvalue'))
+
+# %% markdown
+# ### Permutation and bootstrap tests.
+# Corners per match are counts and not normally distributed, so the t-test is only an approximation.
+# A permutation test shuffles the matches between the two teams many times and checks how often the
+# difference in means is as large as the one observed. The bootstrap test resamples each team's matches
+# after shifting both to the same mean. Each test runs all its replicates as one array operation,
+# seed makes the results reproducible.
+
+# %% codecell
+difference, pvalue = permutation_test(liverpool_corners, everton_corners, n_resamples=50000, seed=42)
+print("Permutation test: Liverpool took %.2f more corners per match than Everton, the P-value is %.2f."%(difference, pvalue))
+difference, pvalue = bootstrap_test(liverpool_corners, everton_corners, n_resamples=50000, seed=42)
+print("Bootstrap test: Liverpool took %.2f more corners per match than Everton, the P-value is %.2f."%(difference, pvalue))
+
+# every pair of teams, chunk_size bounds the memory used by each batch of replicates
+corners = event_column(counts, 'Corner')
+pairwise_permutations = pairwise_resampling_tests(counts[corners], counts['team'], test='permutation',
+                                                  n_resamples=20000, chunk_size=5000, seed=42)
+print(pairwise_permutations.loc[pairwise_permutations['pvalue'] < alpha].sort_values('pvalue'))
@@ -1,58 +1,35 @@
 #importing necessary libraries
-import pathlib
-import os
-import pandas as pd
-import json
-
-#path to data
-path = os.path.join(str(pathlib.Path().resolve()), 'data', 'Wyscout', 'competitions.json') # put # in front if used locally
-#path = os.path.join(str(pathlib.Path().resolve()), 'Wyscout', 'competitions.json') # delete #
+from soccermatics.wyscout import load_all_events, load_competitions, load_matches, load_players
 
 #open data
-with open(path) as f:
-    data = json.load(f)
-    #save it in dataframe
-df_competitions = pd.DataFrame(data)
+#the loaders read from data/Wyscout in the current working directory and cache each file
+#as Arrow on the first run, so later runs skip parsing the JSON
+df_competitions = load_competitions()
 #structure of data
 df_competitions.info()
 
-#path to data
-path = os.path.join(str(pathlib.Path().resolve()), 'data', 'Wyscout', 'matches', 'matches_England.json') # put # in front if used locally
-#path = os.path.join(str(pathlib.Path().resolve()), 'data', 'Wyscout', 'matches_England.json') # delete #
-with open(path) as f:
-    data = json.load(f)
-#save it in a dataframe
-df_matches = pd.DataFrame(data)
+#open data
+df_matches = load_matches('England')
 #structure of data
 df_matches.info()
 
-#path to data
-path = os.path.join(str(pathlib.Path().resolve()), 'data', 'Wyscout', 'players.json') # put # in front if used locally
-#path = os.path.join(str(pathlib.Path().resolve()), 'data', 'Wyscout', 'players.json')
 #open data
-with open(path) as f:
-    data = json.load(f)
-#save it in a dataframe
-df_players = pd.DataFrame(data)
+df_players = load_players()
 #structure of data
 df_players.info()
 
-#prepare empty dataframe
-df_events = pd.DataFrame() # put # in front if used locally
-for i in range(13): # put # in front if used locally
-    #get file name and path to it
-    path = os.path.join(str(pathlib.Path().resolve()), 'data', 'Wyscout', 'events', 'events_England.json') # put # in front if used locally
-    #open data
-    with open(path) as f: # put # in front if used locally
-        data = json.load(f) # put # in front if used locally
-    #append data to the dataframe
-    df_events = pd.concat([df_events, pd.DataFrame(data)]) # put # in front if used locally
-
-
-#path = os.path.join(str(pathlib.Path().resolve()), 'Wyscout', 'events_England_.json') # delete #
-#with open(path) as f: # delete #
-    #data = json.load(f) # delete #
-#df_events = pd.DataFrame(data) # delete #
-
-#structure of data
-df_events.info()
+#open the events of every competition in data/Wyscout/events
+#each file is read in its own process and the results are combined with a single concat
+#the competition column records which file each event came from
+#the pool starts new Python processes on macOS and Windows, which import this script again,
+#so it only runs when the script is run directly
+if __name__ == '__main__':
+    df_events = load_all_events() # put # in front if used locally
+
+    #path = os.path.join(str(pathlib.Path().resolve()), 'Wyscout', 'events_England_.json') # delete #
+    #with open(path) as f: # delete #
+        #data = json.load(f) # delete #
+    #df_events = pd.DataFrame(data) # delete #
+
+    #structure of data
+    df_events.info()
@@ -0,0 +1,2 @@
+# Shared helpers for the Soccermatics scripts.
+# The scripts are run from the repository root, which puts this package on the path.
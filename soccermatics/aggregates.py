@@ -0,0 +1,94 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from soccermatics import wyscout
+from soccermatics.cache import cached_frame
+
+# bump when the layout of the table changes so old caches are rebuilt
+COUNTS_VERSION = 1
+
+
+def team_match_counts(events):
+    # Number of events of every eventName and subEventName for each team in each match, one row per
+    # (teamId, matchId). Columns are the event names, eg. 'Pass', and '<eventName>/<subEventName>',
+    # eg. 'Free Kick/Corner'. Matches a team played without any of an event count as 0.
+    events = events.loc[:, ['teamId', 'matchId', 'eventName', 'subEventName']]
+    index = pd.MultiIndex.from_frame(events[['teamId', 'matchId']].drop_duplicates()).sort_values()
+    by_event = events.groupby(['teamId', 'matchId', 'eventName'], observed=True).size().unstack(fill_value=0)
+    sub_events = events.loc[events['subEventName'].notna() & (events['subEventName'] != '')]
+    by_sub_event = sub_events.groupby(['teamId', 'matchId', 'eventName', 'subEventName'], observed=True).size()
+    by_sub_event = by_sub_event.unstack(['eventName', 'subEventName'], fill_value=0)
+    by_sub_event.columns = [f'{event}/{sub_event}' for event, sub_event in by_sub_event.columns]
+    counts = pd.concat([by_event, by_sub_event], axis=1).reindex(index, fill_value=0)
+    return counts.sort_index(axis=1).astype(np.int32)
+
+
+def load_team_match_counts(competition='England', root=None, refresh=False):
+    # the team_match_counts table of a competition, cached next to the events file it was built from
+    # team names from teams.json are added as the team column
+    path = wyscout.data_path('events', f'events_{competition}.json', root=root)
+    build = lambda path: team_match_counts(wyscout.load_events(competition, root=root)).reset_index()
+    counts = cached_frame(path, build, refresh=refresh, version=COUNTS_VERSION,
+                          name=f'team_match_counts_{competition}')
+    teams = wyscout.load_teams(root=root).set_index('wyId')['name']
+    counts.insert(0, 'team', pd.Categorical(counts['teamId'].map(teams)))
+    return counts.set_index(['teamId', 'matchId'])
+
+
+def event_column(counts, event):
+    # column holding an event, given as an eventName ('Pass'), a subEventName ('Corner') or both ('Free Kick/Corner')
+    if event in counts.columns:
+        return event
+    matches = [column for column in counts.columns if isinstance(column, str) and column.endswith('/' + event)]
+    if len(matches) != 1:
+        raise KeyError(f'{event!r} is not an event in the counts table' if not matches
+                       else f'{event!r} is ambiguous, use one of {matches}')
+    return matches[0]
+
+
+def event_counts(counts, event, team):
+    # counts of an event in each match a team played, team is a name or a teamId
+    if isinstance(team, str):
+        rows = counts.loc[counts['team'] == team]
+    else:
+        rows = counts.xs(team, level='teamId', drop_level=False)
+    return rows[event_column(counts, event)]
+
+
+def one_sample_ttest(counts, event, team, popmean, alternative='two-sided'):
+    return stats.ttest_1samp(event_counts(counts, event, team), popmean=popmean, alternative=alternative)
+
+
+def two_sample_ttest(counts, event, team1, team2, equal_var=False, alternative='two-sided'):
+    return stats.ttest_ind(event_counts(counts, event, team1), event_counts(counts, event, team2),
+                           equal_var=equal_var, alternative=alternative)
+
+
+def pairwise_ttests(counts, event, equal_var=False, alternative='two-sided'):
+    # two-sample t-tests of an event between every pair of teams, computed together from
+    # each team's mean, variance and number of matches
+    column = event_column(counts, event)
+    summary = counts.groupby('team', observed=True)[column].agg(['mean', 'var', 'count'])
+    i, j = np.array(list(itertools.combinations(range(len(summary)), 2)), dtype=int).reshape(-1, 2).T
+    mean, var, n = (summary[c].to_numpy(float) for c in ('mean', 'var', 'count'))
+    if equal_var:
+        dof = n[i] + n[j] - 2
+        pooled = ((n[i] - 1) * var[i] + (n[j] - 1) * var[j]) / dof
+        se = np.sqrt(pooled * (1 / n[i] + 1 / n[j]))
+    else:
+        # Welch's t-test, as ttest_ind with equal_var=False
+        vi, vj = var[i] / n[i], var[j] / n[j]
+        se = np.sqrt(vi + vj)
+        dof = (vi + vj) ** 2 / (vi ** 2 / (n[i] - 1) + vj ** 2 / (n[j] - 1))
+    t = (mean[i] - mean[j]) / se
+    if alternative == 'two-sided':
+        pvalue = 2 * stats.t.sf(np.abs(t), dof)
+    elif alternative == 'greater':
+        pvalue = stats.t.sf(t, dof)
+    else:
+        pvalue = stats.t.cdf(t, dof)
+    return pd.DataFrame({'team1': summary.index[i], 'team2': summary.index[j],
+                         'mean1': mean[i], 'mean2': mean[j], 'statistic': t, 'df': dof, 'pvalue': pvalue})
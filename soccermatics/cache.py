@@ -0,0 +1,109 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# The cache is an Arrow IPC file stored next to the source file.
+# The source file's mtime and size are written into the schema metadata,
+# so editing or replacing the source invalidates the cache. Loaders that add
+# derived columns pass a version, bump it whenever those columns change. Tables built from more than one
+# file list the others as depends, so editing any of them invalidates the cache as well.
+CACHE_DIR = '.cache'
+CACHE_EXT = '.arrow'
+
+
+def cache_path(source, cache_dir=None, name=None):
+    # name defaults to the source file name, tables derived from a source need their own name
+    directory, filename = os.path.split(source)
+    if cache_dir is None:
+        cache_dir = os.path.join(directory, CACHE_DIR)
+    if name is None:
+        name = os.path.splitext(filename)[0]
+    return os.path.join(cache_dir, name + CACHE_EXT)
+
+
+def source_key(source, version=0, depends=()):
+    stat = os.stat(source)
+    key = {b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+           b'source_size': str(stat.st_size).encode(),
+           b'version': str(version).encode()}
+    if depends:
+        stats = [os.stat(path) for path in depends]
+        key[b'depends'] = json.dumps([[stat.st_mtime_ns, stat.st_size] for stat in stats]).encode()
+    return key
+
+
+def is_fresh(source, path, version=0, depends=()):
+    if not os.path.exists(path):
+        return False
+    with pa.memory_map(path) as mm:
+        metadata = ipc.open_file(mm).schema.metadata or {}
+    return all(metadata.get(k) == v for k, v in source_key(source, version, depends).items())
+
+
+def write_frame(df, path, metadata=None, json_columns=()):
+    # columns whose nested values don't map onto a fixed Arrow type (eg. dicts keyed by team id)
+    # are stored as JSON text and decoded again when read
+    df = df.copy(deep=False)
+    for column in json_columns:
+        df[column] = df[column].map(json.dumps)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata.update(metadata or {})
+    schema_metadata[b'json_columns'] = json.dumps(list(json_columns)).encode()
+    table = table.replace_schema_metadata(schema_metadata)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # write to a temporary file first so a crash never leaves a half written cache behind
+    tmp = path + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def filter_expression(filters):
+    # filters is a pyarrow.compute expression or a list of (column, op, value) tuples as in
+    # pyarrow.parquet, eg. [('type_name', '==', 'Pass'), ('x', '>', 60)]
+    if filters is None or isinstance(filters, pc.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def read_frame(path, columns=None, filters=None):
+    # memory map the file so the Arrow buffers are paged in from disk instead of parsed
+    with pa.memory_map(path) as mm:
+        reader = ipc.open_file(mm)
+        metadata = reader.schema.metadata or {}
+        if (columns is None and filters is None) or not reader.schema.names:
+            table = reader.read_all()
+        else:
+            # a dataset scan reads only the projected columns and the ones the filter needs,
+            # and only the matching rows are ever copied into pandas
+            if columns is not None:
+                columns = [column for column in columns if column in reader.schema.names]
+            table = ds.dataset(path, format='ipc').to_table(columns=columns, filter=filter_expression(filters))
+    df = table.to_pandas()
+    for column in json.loads(metadata.get(b'json_columns', b'[]')):
+        if column in df.columns:
+            df[column] = df[column].map(json.loads)
+    return df
+
+
+def cached_frame(source, parse, cache_dir=None, refresh=False, json_columns=(), version=0, name=None,
+                 columns=None, filters=None, depends=()):
+    # return the cached frame for source, calling parse(source) and caching the result if needed
+    # columns and filters are pushed down to the cache read, see read_frame
+    path = cache_path(source, cache_dir, name)
+    if not refresh and is_fresh(source, path, version, depends):
+        return read_frame(path, columns, filters)
+    df = parse(source)
+    write_frame(df, path, metadata=source_key(source, version, depends), json_columns=json_columns)
+    if columns is None and filters is None:
+        return df
+    del df
+    return read_frame(path, columns, filters)
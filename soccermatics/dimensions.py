@@ -0,0 +1,133 @@
+import difflib
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from soccermatics import wyscout
+
+# Dimension indexes of players and teams: the integer id of every name, built once from the names table
+# of a provider so that filters and joins work on ids. Names are looked up in hash maps of their
+# normalized form (accents and case removed, punctuation as spaces) and of their sorted words, so
+# 'son heung-min', 'Heung-Min Son' and 'Son Heung-Min' all resolve to the same id. Only a name neither
+# map knows falls back to a fuzzy scan of the known names.
+
+# letters that don't decompose into a base letter and an accent
+LETTERS = str.maketrans({'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ß': 'ss',
+                         'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE', 'ı': 'i', 'þ': 'th', 'Þ': 'TH'})
+FUZZY_CUTOFF = 0.85
+_ESCAPE = re.compile(r'\\u([0-9a-fA-F]{4})')
+_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize_name(name):
+    # 'Nicolás  Otamendi' -> 'nicolas otamendi'. Some Wyscout names keep their JSON escapes, eg. 'Nicol\\u00e1s'.
+    name = _ESCAPE.sub(lambda match: chr(int(match.group(1), 16)), str(name)).translate(LETTERS)
+    name = ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+    return _SEPARATORS.sub(' ', name.casefold()).strip()
+
+
+def token_key(name):
+    # the words of a normalized name in sorted order, for names given in another order
+    return ' '.join(sorted(name.split()))
+
+
+class DimensionIndex:
+    # ids is an array of integer ids and names a list of name columns of the same length, the first one is
+    # the display name, eg. the shortName of a Wyscout player, the others are aliases, eg. first + last name.
+
+    def __init__(self, ids, names, kind='player'):
+        ids = np.asarray(ids, dtype=np.int64)
+        self.kind = kind
+        display = pd.Series(np.asarray(names[0], dtype=object), index=ids)
+        self.names = display[~display.index.duplicated()].sort_index()
+        self._exact = {}
+        self._tokens = {}
+        for column in names:
+            for id_, name in zip(ids, column):
+                if pd.isna(name) or not str(name).strip():
+                    continue
+                key = normalize_name(name)
+                self._exact.setdefault(key, set()).add(int(id_))
+                self._tokens.setdefault(token_key(key), set()).add(int(id_))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return bool(self.candidates(name))
+
+    def candidates(self, name, fuzzy=True):
+        # ids the name could refer to, exact matches first, then the same words in another order,
+        # then the closest known names
+        key = normalize_name(name)
+        ids = self._exact.get(key) or self._tokens.get(token_key(key))
+        if ids or not fuzzy:
+            return sorted(ids or ())
+        close = difflib.get_close_matches(key, self._exact, n=1, cutoff=FUZZY_CUTOFF)
+        return sorted(self._exact[close[0]]) if close else []
+
+    def id(self, name, fuzzy=True):
+        # the id of a name, a KeyError if no or more than one id matches
+        ids = self.candidates(name, fuzzy)
+        if len(ids) != 1:
+            raise KeyError(f'no {self.kind} named {name!r}' if not ids
+                           else f'{name!r} is ambiguous, use one of the {self.kind} ids {ids}')
+        return ids[0]
+
+    def ids(self, names, fuzzy=True):
+        # the ids of many names, each name is resolved once however often it appears
+        names = pd.Series(names)
+        resolved = {name: self.id(name, fuzzy) for name in names.dropna().unique()}
+        return names.map(resolved).astype('Int64')
+
+    def name(self, id_):
+        return self.names.loc[id_]
+
+    def join(self, df, on, column=None):
+        # a copy of df with the display name of the ids in column on, missing where the id is unknown
+        # the names are taken by position from the sorted id index, so nothing is compared as a string
+        column = column or on.removesuffix('_id').removesuffix('Id') + '_name'
+        position = self.names.index.get_indexer(pd.to_numeric(df[on]).astype(float).fillna(-1).astype(np.int64))
+        values = np.where(position >= 0, self.names.to_numpy()[position], None)
+        return df.assign(**{column: pd.Categorical(values)})
+
+    def short_names(self, ids=None):
+        # last word of the display name of each id, or the whole name for ids sharing their last word with
+        # another of the ids. Returned as a Series indexed by id.
+        names = self.names if ids is None else self.names.loc[pd.unique(np.asarray(ids, dtype=np.int64))]
+        last = names.str.split().str[-1]
+        shared = last.duplicated(keep=False)
+        return last.where(~shared, names)
+
+
+def wyscout_players(root=None, refresh=False):
+    players = wyscout.load_players(root=root, refresh=refresh)
+    full = players['firstName'].fillna('') + ' ' + players['lastName'].fillna('')
+    return DimensionIndex(players['wyId'], [players['shortName'], full], kind='player')
+
+
+def wyscout_teams(root=None, refresh=False):
+    teams = wyscout.load_teams(root=root, refresh=refresh)
+    return DimensionIndex(teams['wyId'], [teams['name'], teams['officialName']], kind='team')
+
+
+def _statsbomb_pairs(events, pairs):
+    # (id, name) pairs from several column pairs of a StatsBomb table, eg. passers and recipients
+    frames = [events[[id_, name]].set_axis(['id', 'name'], axis=1) for id_, name in pairs
+              if id_ in events.columns and name in events.columns]
+    table = pd.concat(frames, ignore_index=True).dropna().drop_duplicates('id')
+    return table['id'].astype(np.int64), table['name'].astype(str)
+
+
+def statsbomb_players(events):
+    # players named in an event table, including the ones who only received passes or came on as substitutes
+    ids, names = _statsbomb_pairs(events, [('player_id', 'player_name'), ('pass_recipient_id', 'pass_recipient_name'),
+                                           ('substitution_replacement_id', 'substitution_replacement_name')])
+    return DimensionIndex(ids, [names], kind='player')
+
+
+def statsbomb_teams(events):
+    ids, names = _statsbomb_pairs(events, [('team_id', 'team_name'), ('possession_team_id', 'possession_team_name')])
+    return DimensionIndex(ids, [names], kind='team')
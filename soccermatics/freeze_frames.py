@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from soccermatics.cache import CACHE_EXT
+
+# StatsBomb 360 and shot freeze frames as fixed-shape arrays: the players of each event fill the slots
+# of one row, padded with NaN, so every metric is computed for all events of a match at once.
+# Coordinates are StatsBomb's, from the view of the team making the event (attacking the goal at x=120).
+
+SLOTS = 22
+GOAL_X = 120
+GOAL_Y = 40
+GOAL_WIDTH = 8
+# bump when the arrays change so cached ones are rebuilt
+FRAMES_VERSION = 1
+
+
+class FreezeFrames:
+    # ids (event) and per slot xy (event, slot, 2), teammate, keeper and actor flags (event, slot) and
+    # the ball location (event, 2). Empty slots have NaN coordinates and all flags False.
+
+    def __init__(self, ids, xy, teammate, keeper, actor, ball):
+        self.ids = np.asarray(ids)
+        self.xy = xy
+        self.teammate = teammate
+        self.keeper = keeper
+        self.actor = actor
+        self.ball = ball
+        self.rows = pd.Index(self.ids)
+
+    @classmethod
+    def from_frame(cls, frame, events=None, slots=SLOTS):
+        # frame is a parser.frame() 360 table or the freeze table of parser.event(). The ball is at the
+        # event location when events (with id, x and y) are given, otherwise at the actor.
+        codes, ids = pd.factorize(frame['id'], sort=False)
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        # slot of each player: its position within the rows of its event
+        starts = np.searchsorted(codes, np.arange(len(ids)))
+        slot = np.arange(len(codes)) - starts[codes]
+        keep = slot < slots
+        codes, slot, order = codes[keep], slot[keep], order[keep]
+
+        shape = (len(ids), slots)
+        xy = np.full(shape + (2,), np.nan, dtype=np.float32)
+        xy[codes, slot, 0] = frame['x'].to_numpy(np.float32)[order]
+        xy[codes, slot, 1] = frame['y'].to_numpy(np.float32)[order]
+        flags = {}
+        for name in ('teammate', 'keeper', 'actor'):
+            values = np.zeros(shape, dtype=bool)
+            if name in frame.columns:
+                column = frame[name].to_numpy(bool)
+            elif name == 'keeper' and 'position_name' in frame.columns:
+                # shot freeze frames name the position instead of flagging the keeper
+                column = (frame['position_name'] == 'Goalkeeper').to_numpy()
+            else:
+                column = None
+            if column is not None:
+                values[codes, slot] = column[order]
+            flags[name] = values
+
+        if events is not None:
+            location = events.set_index('id').reindex(ids)[['x', 'y']].to_numpy(np.float32)
+        else:
+            location = np.full((len(ids), 2), np.nan, dtype=np.float32)
+            event, actor_slot = np.nonzero(flags['actor'])
+            location[event] = xy[event, actor_slot]
+        return cls(np.asarray(ids), xy, flags['teammate'], flags['keeper'], flags['actor'], location)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def opponents(self):
+        return ~self.teammate & ~np.isnan(self.xy[..., 0])
+
+    def defenders_between(self, include_keeper=True):
+        # opponents inside the triangle formed by the ball and the goal posts
+        posts = np.array([[GOAL_X, GOAL_Y - GOAL_WIDTH / 2], [GOAL_X, GOAL_Y + GOAL_WIDTH / 2]])
+        ball = self.ball[:, None, :]
+        # a point is inside when it is on the same side of all three edges
+        corners = [ball, np.broadcast_to(posts[0], ball.shape), np.broadcast_to(posts[1], ball.shape)]
+        sides = []
+        for a, b in zip(corners, corners[1:] + corners[:1]):
+            sides.append((b[..., 0] - a[..., 0]) * (self.xy[..., 1] - a[..., 1])
+                         - (b[..., 1] - a[..., 1]) * (self.xy[..., 0] - a[..., 0]))
+        sides = np.stack(sides)
+        inside = (sides >= 0).all(axis=0) | (sides <= 0).all(axis=0)
+        defenders = inside & self.opponents()
+        if not include_keeper:
+            defenders &= ~self.keeper
+        return defenders.sum(axis=1)
+
+    def nearest_opponent(self):
+        # distance from the ball to the closest opponent in the frame, NaN when none is visible
+        distance = np.linalg.norm(self.xy - self.ball[:, None, :], axis=2)
+        distance = np.where(self.opponents(), distance, np.inf).min(axis=1)
+        return np.where(np.isinf(distance), np.nan, distance)
+
+    def lane_openness(self):
+        # (event, slot) distance from each passing lane, the segment from the ball to a teammate,
+        # to the closest opponent. NaN for the slots that are not teammates or when no opponent is visible.
+        ball = self.ball[:, None, None, :]
+        receiver = self.xy[:, :, None, :]
+        opponent = self.xy[:, None, :, :]
+        lane = receiver - ball
+        length = np.maximum((lane ** 2).sum(axis=3), 1e-9)
+        # projection of each opponent onto each lane, clamped to the segment
+        t = np.clip(((opponent - ball) * lane).sum(axis=3) / length, 0, 1)
+        distance = np.linalg.norm(ball + t[..., None] * lane - opponent, axis=3)
+        distance = np.where(self.opponents()[:, None, :], distance, np.inf).min(axis=2)
+        receivers = self.teammate & ~self.actor & ~np.isnan(self.xy[..., 0])
+        return np.where(receivers & ~np.isinf(distance), distance, np.nan).astype(np.float32)
+
+    def metrics(self, open_distance=2.0):
+        # one row per event, open_lanes counts teammates whose lane has no opponent within open_distance
+        openness = self.lane_openness()
+        return pd.DataFrame({
+            'defenders_between': self.defenders_between(),
+            'nearest_opponent': self.nearest_opponent(),
+            'open_lanes': (openness > open_distance).sum(axis=1),
+            'most_open_lane': np.nanmax(np.where(np.isnan(openness), -np.inf, openness), axis=1),
+        }, index=pd.Index(self.ids, name='id')).replace(-np.inf, np.nan)
+
+    def save(self, path):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, version=FRAMES_VERSION, ids=self.ids.astype(str), xy=self.xy, teammate=self.teammate,
+                     keeper=self.keeper, actor=self.actor, ball=self.ball)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data['version']) != FRAMES_VERSION:
+                return None
+            return cls(data['ids'], data['xy'], data['teammate'], data['keeper'], data['actor'], data['ball'])
+
+
+def load_freeze_frames(parser, match_id, refresh=False):
+    # the 360 frames of a match as FreezeFrames, with the ball at the event locations. The arrays are
+    # cached next to the parser's cached frame table and rebuilt when that table is newer.
+    directory = os.path.join(parser.cache_dir, 'three-sixty', str(match_id))
+    path = os.path.join(directory, 'arrays.npz')
+    source = os.path.join(directory, 'frame' + CACHE_EXT)
+    if not refresh and os.path.exists(path) and os.path.exists(source) \
+            and os.path.getmtime(path) >= os.path.getmtime(source):
+        frames = FreezeFrames.load(path)
+        if frames is not None:
+            return frames
+    frame, = parser.frame(match_id, tables=('frame',))
+    events, = parser.event(match_id, tables=('event',), columns=['id', 'x', 'y'])
+    frames = FreezeFrames.from_frame(frame, events)
+    os.makedirs(directory, exist_ok=True)
+    frames.save(path)
+    return frames
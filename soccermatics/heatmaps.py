@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+
+from soccermatics.normalize import PITCH_LENGTH, PITCH_WIDTH, metric_pitch
+
+# Heatmaps of events on the metric pitch of soccermatics.normalize. Locations are binned with one
+# bincount over (entity, bin) pairs, so the heatmaps of every player or team are rows of one dense array.
+
+
+class Grid:
+    # rectangular bins given by their x and y edges in metres, numbered row by row from the bottom left
+
+    def __init__(self, x_edges, y_edges):
+        self.x_edges = np.asarray(x_edges, dtype=float)
+        self.y_edges = np.asarray(y_edges, dtype=float)
+        self.shape = (len(self.y_edges) - 1, len(self.x_edges) - 1)
+        self.size = self.shape[0] * self.shape[1]
+
+    def bin(self, x, y):
+        # bin number of each location, -1 for locations missing or off the pitch
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        # searchsorted on the inner edges puts locations on the touch and goal lines in the outer bins
+        column = np.searchsorted(self.x_edges[1:-1], x, side='right')
+        row = np.searchsorted(self.y_edges[1:-1], y, side='right')
+        inside = ((x >= self.x_edges[0]) & (x <= self.x_edges[-1]) & (y >= self.y_edges[0]) & (y <= self.y_edges[-1]))
+        return np.where(inside, row * self.shape[1] + column, -1)
+
+    def bin_statistic(self, values, pitch=None):
+        # a (rows, columns) heatmap as the stats dict mplsoccer's pitch.heatmap draws
+        pitch = metric_pitch() if pitch is None else pitch
+        cx = (self.x_edges[:-1] + self.x_edges[1:]) / 2
+        cy = (self.y_edges[:-1] + self.y_edges[1:]) / 2
+        cx, cy = np.meshgrid(cx, cy)
+        # bin the centre of each cell with its own number, so the layout of the stats follows mplsoccer's
+        stats = pitch.bin_statistic(cx.ravel(), cy.ravel(), values=np.arange(self.size), statistic='mean',
+                                    bins=(self.x_edges, self.y_edges))
+        stats['statistic'] = np.asarray(values, dtype=float).ravel()[stats['statistic'].astype(int)]
+        return stats
+
+
+def uniform_grid(columns=12, rows=8):
+    return Grid(np.linspace(0, PITCH_LENGTH, columns + 1), np.linspace(0, PITCH_WIDTH, rows + 1))
+
+
+def positional_grid():
+    # the Juego de Posición zones drawn by Pitch(positional=True), as the grid of their lines
+    dim = metric_pitch().dim
+    return Grid(dim.positional_x, dim.positional_y)
+
+
+class HeatmapStore:
+    # Start and end location counts of the events of every entity (eg. player_id or team_id) as dense
+    # (entity, bin) arrays. update() adds the events of new matches, so a season is ingested match by match
+    # and matches already in the store are skipped.
+
+    def __init__(self, grid=None, by='player_id', match='match_id'):
+        self.grid = uniform_grid() if grid is None else grid
+        self.by = by
+        self.match = match
+        self.rows = {}
+        self.matches = set()
+        self.start = np.zeros((0, self.grid.size), dtype=np.int32)
+        self.end = np.zeros((0, self.grid.size), dtype=np.int32)
+
+    def _rows(self, entities):
+        # row of each entity, adding rows for the ones not seen before
+        new = [entity for entity in dict.fromkeys(entities.tolist()) if entity not in self.rows]
+        if new:
+            self.rows.update({entity: len(self.rows) + i for i, entity in enumerate(new)})
+            padding = np.zeros((len(new), self.grid.size), dtype=np.int32)
+            self.start = np.vstack([self.start, padding])
+            self.end = np.vstack([self.end, padding])
+        return np.fromiter((self.rows[entity] for entity in entities.tolist()), dtype=np.int64, count=len(entities))
+
+    @property
+    def entities(self):
+        # the entity of each row
+        return np.array(list(self.rows))
+
+    def update(self, events):
+        # events on the metric pitch, eg. the passes of a normalized table
+        events = events.loc[~events[self.match].isin(self.matches) & events[self.by].notna()]
+        if events.empty:
+            return self
+        rows = self._rows(events[self.by].to_numpy())
+        for counts, (x, y) in ((self.start, ('x', 'y')), (self.end, ('end_x', 'end_y'))):
+            if x not in events.columns:
+                continue
+            bins = self.grid.bin(events[x], events[y])
+            keep = bins >= 0
+            counts += np.bincount(rows[keep] * self.grid.size + bins[keep],
+                                  minlength=counts.size).reshape(counts.shape).astype(np.int32)
+        self.matches.update(events[self.match].unique().tolist())
+        return self
+
+    def heatmap(self, entity, end=False, normalize=False):
+        # (rows, columns) counts of an entity, or the share of its events in each bin
+        counts = (self.end if end else self.start)[self.rows[entity]]
+        if normalize:
+            counts = counts / max(counts.sum(), 1)
+        return counts.reshape(self.grid.shape)
+
+    def compare(self, entity, other, end=False):
+        # difference between the shares of two entities' events in each bin
+        return self.heatmap(entity, end, normalize=True) - self.heatmap(other, end, normalize=True)
+
+    def save(self, path):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, x_edges=self.grid.x_edges, y_edges=self.grid.y_edges, entities=self.entities,
+                     matches=np.array(sorted(self.matches)), start=self.start, end=self.end)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, by='player_id', match='match_id'):
+        with np.load(path) as data:
+            store = cls(Grid(data['x_edges'], data['y_edges']), by, match)
+            store.rows = {entity: i for i, entity in enumerate(data['entities'].tolist())}
+            store.matches = set(data['matches'].tolist())
+            store.start, store.end = data['start'], data['end']
+        return store
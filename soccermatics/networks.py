@@ -0,0 +1,305 @@
+import numpy as np
+import pandas as pd
+
+
+def _codes(values):
+    # integer code per distinct value, codes follow the sorted order of the values
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, uniques
+
+
+def passing_networks(passes, by=(), passer='player_name', recipient='pass_recipient_name', directed=False):
+    # Passing networks for every group (eg. by=['match_id', 'team_name']) of completed passes.
+    # Node position is the average of a player's mean pass location and mean receiving location,
+    # as in Passing Networks.py, and only players who both passed and received are nodes.
+    # Players are replaced by integer codes, so each count or mean is one bincount over the
+    # whole table and the edge endpoints are looked up by array indexing.
+    by = [by] if isinstance(by, str) else list(by)
+    passes = passes.loc[passes[passer].notna() & passes[recipient].notna()]
+    n = len(passes)
+
+    # one code space for passers and recipients
+    player_code, players = _codes(pd.concat([passes[passer], passes[recipient]], ignore_index=True))
+    n_players = len(players)
+    src, dst = player_code[:n], player_code[n:]
+    if by:
+        group_code, groups = pd.MultiIndex.from_frame(passes[by]).factorize()
+        groups = groups.set_names(by)
+    else:
+        group_code, groups = np.zeros(n, dtype=np.int64), None
+    n_nodes = (group_code.max() + 1 if n else 0) * n_players
+
+    # node statistics, indexed by group * n_players + player
+    src_node = group_code * n_players + src
+    dst_node = group_code * n_players + dst
+    pass_count = np.bincount(src_node, minlength=n_nodes)
+    receive_count = np.bincount(dst_node, minlength=n_nodes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        node_x = (np.bincount(src_node, passes['x'].to_numpy(float), n_nodes) / pass_count
+                  + np.bincount(dst_node, passes['end_x'].to_numpy(float), n_nodes) / receive_count) / 2
+        node_y = (np.bincount(src_node, passes['y'].to_numpy(float), n_nodes) / pass_count
+                  + np.bincount(dst_node, passes['end_y'].to_numpy(float), n_nodes) / receive_count) / 2
+    is_node = (pass_count > 0) & (receive_count > 0)
+
+    # edges, indexed by node * n_players + player
+    if directed:
+        a, b = src, dst
+    else:
+        a, b = np.minimum(src, dst), np.maximum(src, dst)
+    edge, edge_count = np.unique((group_code * n_players + a) * n_players + b, return_counts=True)
+    edge_a_node, edge_b = np.divmod(edge, n_players)
+    edge_group, edge_a = np.divmod(edge_a_node, n_players)
+    edge_b_node = edge_group * n_players + edge_b
+    # drop edges to players who aren't nodes, they have no position
+    keep = is_node[edge_a_node] & is_node[edge_b_node]
+
+    node_index = np.flatnonzero(is_node)
+    node_group, node_player = np.divmod(node_index, n_players)
+    nodes = pd.DataFrame({'player': players[node_player],
+                          'x': node_x[node_index], 'y': node_y[node_index],
+                          'pass_count': pass_count[node_index], 'receive_count': receive_count[node_index]})
+    edges = pd.DataFrame({'passer' if directed else 'player1': players[edge_a[keep]],
+                          'recipient' if directed else 'player2': players[edge_b[keep]],
+                          'pass_count': edge_count[keep],
+                          'x': node_x[edge_a_node[keep]], 'y': node_y[edge_a_node[keep]],
+                          'end_x': node_x[edge_b_node[keep]], 'end_y': node_y[edge_b_node[keep]]})
+    if by:
+        nodes = pd.concat([groups[node_group].to_frame(index=False), nodes], axis=1)
+        edges = pd.concat([groups[edge_group[keep]].to_frame(index=False), edges], axis=1)
+    return nodes, edges
+
+
+def passing_network(passes, passer='player_name', recipient='pass_recipient_name', directed=False):
+    # nodes and edges of a single passing network, eg. one team in one match
+    return passing_networks(passes, passer=passer, recipient=recipient, directed=directed)
+
+
+def adjacency_matrices(passes, by=('match_id', 'team_name'), passer='player_name', recipient='pass_recipient_name'):
+    # Pass counts of every group as one (group x passer x recipient) array.
+    # Each group's players get their own slots 0..n-1, names holds the player in each slot ('' if unused).
+    by = [by] if isinstance(by, str) else list(by)
+    passes = passes.loc[passes[passer].notna() & passes[recipient].notna()]
+    n = len(passes)
+    player_code, players = _codes(pd.concat([passes[passer], passes[recipient]], ignore_index=True))
+    n_players = len(players)
+    if by:
+        group_code, groups = pd.MultiIndex.from_frame(passes[by]).factorize()
+        groups = groups.set_names(by)
+    else:
+        group_code, groups = np.zeros(n, dtype=np.int64), pd.RangeIndex(1)
+
+    # slot of each player within its group, from the sorted (group, player) keys
+    keys, inverse = np.unique(np.concatenate([group_code, group_code]) * n_players + player_code, return_inverse=True)
+    key_group, key_player = np.divmod(keys, n_players)
+    slot = np.arange(len(keys)) - np.searchsorted(key_group, key_group)
+    n_slots = slot.max() + 1 if len(keys) else 0
+
+    names = np.full((len(groups), n_slots), '', dtype=object)
+    names[key_group, slot] = players[key_player]
+    counts = np.zeros((len(groups), n_slots, n_slots), dtype=np.int64)
+    np.add.at(counts, (group_code, slot[inverse[:n]], slot[inverse[n:]]), 1)
+    return groups, names, counts
+
+
+def network_metrics(counts, active, players=11):
+    # Centralisation, density and hub of every network in a (group x passer x recipient) array.
+    # active marks the used slots and players is the team size N, a scalar or one value per group.
+    # Centralisation follows Grund (2012): SUM(P_max - P_i) / ((N-1) * SUM(P_i)), P_i passes made by player i.
+    players = np.broadcast_to(np.asarray(players, dtype=float), counts.shape[:1])
+    made = counts.sum(axis=2)
+    received = counts.sum(axis=1)
+    total = made.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centralisation = ((made.max(axis=1)[:, None] - made) * active).sum(axis=1) / ((players - 1) * total)
+
+    # links between different players, in one or either direction
+    off_diagonal = ~np.eye(counts.shape[1], dtype=bool)
+    directed_links = ((counts > 0) & off_diagonal).sum(axis=(1, 2))
+    undirected_links = (((counts + counts.transpose(0, 2, 1)) > 0) & off_diagonal).sum(axis=(1, 2)) // 2
+
+    involvements = made + received
+    hub = involvements.argmax(axis=1)
+    return {'passes': total,
+            'centralisation': centralisation,
+            'directed_density': directed_links / (players * (players - 1)),
+            'undirected_density': undirected_links / (players * (players - 1) / 2),
+            'hub_slot': hub,
+            'hub_involvements': involvements[np.arange(len(hub)), hub]}
+
+
+def passing_metrics(passes, by=('match_id', 'team_name'), passer='player_name', recipient='pass_recipient_name',
+                    players=11, exclude=()):
+    # network metrics for every group of completed passes, one row per group
+    # players in exclude (eg. the goalkeepers) are removed from the networks and from the team size
+    groups, names, counts = adjacency_matrices(passes, by, passer, recipient)
+    if not len(groups) or not counts.shape[1]:
+        # no passes to reduce over, the same columns with no passer in any network
+        return pd.DataFrame({'passes': np.zeros(len(groups), dtype=np.int64), 'centralisation': np.nan,
+                             'directed_density': 0.0, 'undirected_density': 0.0,
+                             'hub_involvements': np.zeros(len(groups), dtype=np.int64), 'hub': ''}, index=groups)
+    active = names != ''
+    team_size = np.full(len(groups), players)
+    if len(exclude):
+        dropped = np.isin(names, list(exclude))
+        counts = counts * ~dropped[:, :, None] * ~dropped[:, None, :]
+        active &= ~dropped
+        team_size = team_size - dropped.sum(axis=1)
+    metrics = network_metrics(counts, active, team_size)
+    hub_slot = metrics.pop('hub_slot')
+    metrics = pd.DataFrame(metrics, index=groups)
+    metrics['hub'] = names[np.arange(len(groups)), hub_slot]
+    return metrics
+
+
+def goalkeepers(events, player='player_name'):
+    # players who played as goalkeeper in the events, to pass as exclude to passing_metrics
+    return events.loc[events['position_name'] == 'Goalkeeper', player].dropna().drop_duplicates()
+
+
+def _network_frames(names, made, made_x, made_y, received, received_x, received_y, src, dst, count, directed):
+    # nodes and edges, as returned by passing_network, from per-player sums and per-edge counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = (made_x / made + received_x / received) / 2
+        y = (made_y / made + received_y / received) / 2
+    is_node = (made > 0) & (received > 0)
+    if not directed and len(src):
+        # merge a->b and b->a into one undirected edge, with the players in name order like passing_network
+        rank = np.argsort(np.argsort(names))
+        swap = rank[src] > rank[dst]
+        a, b = np.where(swap, dst, src), np.where(swap, src, dst)
+        key, inverse = np.unique(a * len(names) + b, return_inverse=True)
+        count = np.bincount(inverse, weights=count).astype(np.int64)
+        src, dst = np.divmod(key, len(names))
+    keep = is_node[src] & is_node[dst]
+    src, dst = src[keep], dst[keep]
+    node = np.flatnonzero(is_node)
+    nodes = pd.DataFrame({'player': names[node], 'x': x[node], 'y': y[node],
+                          'pass_count': made[node], 'receive_count': received[node]})
+    edges = pd.DataFrame({'passer' if directed else 'player1': names[src],
+                          'recipient' if directed else 'player2': names[dst],
+                          'pass_count': count[keep],
+                          'x': x[src], 'y': y[src], 'end_x': x[dst], 'end_y': y[dst]})
+    return nodes, edges
+
+
+class LivePassingNetwork:
+    # Passing network of one team that is updated as events arrive, eg. from a live feed.
+    # Each completed pass updates the running sums of its passer, its recipient and its edge in O(1),
+    # and is appended to a log so any time window can be rebuilt from a slice of the log.
+    # Substitutions of the team split the match into segments at their position in the log, ie. in event
+    # order, as the clock of first half stoppage time runs past the start of the second half.
+
+    LOG_COLUMNS = ('period', 'time', 'passer', 'recipient', 'x', 'y', 'end_x', 'end_y')
+
+    def __init__(self, team=None, passer='player_name', recipient='pass_recipient_name',
+                 exclude_sub_types=('Throw-in',), directed=False):
+        self.team = team
+        self.passer = passer
+        self.recipient = recipient
+        self.exclude_sub_types = set(exclude_sub_types)
+        self.directed = directed
+        self.players = {}
+        self.names = []
+        # running sums per player code, grown by one when a new player appears
+        self.made = []
+        self.made_x = []
+        self.made_y = []
+        self.received = []
+        self.received_x = []
+        self.received_y = []
+        self.edges = {}
+        # number of passes logged before each substitution
+        self.substitutions = []
+        self._log = np.empty((256, len(self.LOG_COLUMNS)))
+        self._size = 0
+
+    def _code(self, name):
+        code = self.players.get(name)
+        if code is None:
+            code = self.players[name] = len(self.names)
+            self.names.append(name)
+            for sums in (self.made, self.made_x, self.made_y, self.received, self.received_x, self.received_y):
+                sums.append(0)
+        return code
+
+    def _is_pass(self, event):
+        return (event.get('type_name') == 'Pass' and pd.isna(event.get('outcome_name'))
+                and pd.notna(event.get(self.recipient)) and event.get('sub_type_name') not in self.exclude_sub_types)
+
+    def add(self, event):
+        # add one event (a dict or a row of the events frame), anything but the team's completed passes
+        # and substitutions is ignored
+        if self.team is not None and event.get('team_name') != self.team:
+            return
+        if event.get('type_name') == 'Substitution':
+            self.substitutions.append(self._size)
+            return
+        if not self._is_pass(event):
+            return
+        src, dst = self._code(event[self.passer]), self._code(event[self.recipient])
+        x, y, end_x, end_y = event['x'], event['y'], event['end_x'], event['end_y']
+        self.made[src] += 1
+        self.made_x[src] += x
+        self.made_y[src] += y
+        self.received[dst] += 1
+        self.received_x[dst] += end_x
+        self.received_y[dst] += end_y
+        self.edges[src, dst] = self.edges.get((src, dst), 0) + 1
+
+        if self._size == len(self._log):
+            self._log = np.concatenate([self._log, np.empty_like(self._log)])
+        self._log[self._size] = event['period'], event['minute'] * 60 + event['second'], src, dst, x, y, end_x, end_y
+        self._size += 1
+
+    def update(self, events):
+        # add a batch of events, a DataFrame or any iterable of dicts, in match order
+        if isinstance(events, pd.DataFrame):
+            events = events.to_dict('records')
+        for event in events:
+            self.add(event)
+
+    def snapshot(self):
+        # the network of every pass so far, straight from the running sums
+        edges = np.array(list(self.edges), dtype=np.int64).reshape(-1, 2)
+        src, dst = edges[:, 0], edges[:, 1]
+        return _network_frames(np.array(self.names, dtype=object),
+                               *(np.array(sums, dtype=float) for sums in (self.made, self.made_x, self.made_y,
+                                                                        self.received, self.received_x, self.received_y)),
+                               src, dst, np.fromiter(self.edges.values(), dtype=np.int64, count=len(self.edges)),
+                               self.directed)
+
+    def _network(self, log):
+        # the network of the passes in some rows of the log
+        n = len(self.names)
+        src, dst = log[:, 2].astype(np.int64), log[:, 3].astype(np.int64)
+        edge, count = np.unique(src * n + dst, return_counts=True)
+        return _network_frames(np.array(self.names, dtype=object),
+                               np.bincount(src, minlength=n), np.bincount(src, log[:, 4], n), np.bincount(src, log[:, 5], n),
+                               np.bincount(dst, minlength=n), np.bincount(dst, log[:, 6], n), np.bincount(dst, log[:, 7], n),
+                               *np.divmod(edge, n), count, self.directed)
+
+    def window(self, start=None, end=None, period=None):
+        # the network of the passes made between start and end, in minutes, in one period or in all of them
+        # a mask rather than a binary search, first half stoppage time overlaps the start of the second half,
+        # so pass the period to keep them apart
+        log = self._log[:self._size]
+        in_window = np.ones(len(log), dtype=bool)
+        if period is not None:
+            in_window &= log[:, 0] == period
+        if start is not None:
+            in_window &= log[:, 1] >= start * 60
+        if end is not None:
+            in_window &= log[:, 1] < end * 60
+        return self._network(log[in_window])
+
+    def last(self, minutes=15):
+        # the network of the most recent minutes of passes in the current period, eg. the last 15 minutes
+        if not self._size:
+            return self.window()
+        period, time = self._log[self._size - 1, :2]
+        return self.window(start=time / 60 - minutes, period=period)
+
+    def segments(self):
+        # one network per segment of the match, split at each of the team's substitutions
+        bounds = [0] + sorted(self.substitutions) + [self._size]
+        return [self._network(self._log[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
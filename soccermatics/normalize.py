@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from mplsoccer import Pitch, Standardizer, VerticalPitch
+
+from soccermatics import schema
+
+# Every provider is converted to one metric pitch, 105m by 68m with the origin in the bottom left corner
+# and each team attacking left to right. mplsoccer's Standardizer maps the pitch markings of each
+# provider onto the metric ones, so eg. the edge of the StatsBomb box (x=102) lands 16.5m from goal.
+PITCH_LENGTH = 105
+PITCH_WIDTH = 68
+COORDINATES = (('x', 'y'), ('end_x', 'end_y'))
+
+# column names of each provider, the Wyscout ones are renamed to the StatsBomb names. Both give every
+# event from the view of the team making it, ie. already attacking left to right.
+PROVIDERS = {
+    'statsbomb': {'pitch_type': 'statsbomb', 'columns': {}},
+    'wyscout': {'pitch_type': 'wyscout',
+                'columns': {'matchId': 'match_id', 'matchPeriod': 'period', 'teamId': 'team_id',
+                            'playerId': 'player_id', 'eventName': 'type_name', 'subEventName': 'sub_type_name'}},
+}
+# Wyscout periods as the StatsBomb period numbers
+WYSCOUT_PERIODS = {'1H': 1, '2H': 2, 'E1': 3, 'E2': 4, 'P': 5}
+
+
+def metric_pitch(vertical=False, **kwargs):
+    # the mplsoccer pitch the normalized coordinates are drawn on
+    return (VerticalPitch if vertical else Pitch)(pitch_type='custom', pitch_length=PITCH_LENGTH,
+                                                  pitch_width=PITCH_WIDTH, **kwargs)
+
+
+def to_metric(df, provider):
+    # a copy of df with the x, y, end_x and end_y columns it has converted to metres
+    standardizer = Standardizer(pitch_from=PROVIDERS[provider]['pitch_type'], pitch_to='custom',
+                                length_to=PITCH_LENGTH, width_to=PITCH_WIDTH)
+    df = df.copy(deep=False)
+    for x, y in COORDINATES:
+        if x in df.columns and y in df.columns:
+            metric_x, metric_y = standardizer.transform(df[x].to_numpy(float), df[y].to_numpy(float))
+            df[x], df[y] = metric_x.astype(np.float32), metric_y.astype(np.float32)
+    return df
+
+
+def attacking_left(df, by=('match_id', 'period', 'team_id'), shot='Shot'):
+    # True for the events of every (match, period, team) attacking right to left, for tables in fixed
+    # pitch coordinates. A team shoots at the goal it attacks, so the direction comes from the mean x of
+    # its shots, and from the sign of its summed ball progress (end_x - x) when it has no shots.
+    groups = df.groupby(list(by), sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    count = groups.max() + 1 if len(groups) else 0
+    x = df['x'].to_numpy(float)
+    is_shot = (df['type_name'] == shot).to_numpy() & ~np.isnan(x)
+    shots = np.bincount(groups, weights=is_shot, minlength=count)
+    shot_x = np.bincount(groups[is_shot], weights=x[is_shot], minlength=count) / np.maximum(shots, 1)
+    progress = np.bincount(groups, weights=np.nan_to_num((df['end_x'] - df['x']).to_numpy(float)), minlength=count)
+    left = np.where(shots > 0, shot_x < PITCH_LENGTH / 2, progress < 0)
+    return left[groups]
+
+
+def orient(df, flip):
+    # a copy of df with the coordinates of the flipped events rotated to the other end of the pitch
+    df = df.copy(deep=False)
+    for x, y in COORDINATES:
+        if x in df.columns:
+            df[x] = np.where(flip, PITCH_LENGTH - df[x], df[x]).astype(np.float32)
+            df[y] = np.where(flip, PITCH_WIDTH - df[y], df[y]).astype(np.float32)
+    return df
+
+
+def normalize(df, provider, orient_teams=False):
+    # Events of either provider on the metric pitch with every team attacking left to right in each period.
+    # The Wyscout columns get the StatsBomb names (match_id, period, team_id, player_id, type_name and
+    # sub_type_name) and a provider column is added, so the tables of both can be concatenated.
+    # Pass orient_teams=True for tables in fixed pitch coordinates, the directions then come from attacking_left.
+    df = to_metric(df, provider).rename(columns=PROVIDERS[provider]['columns'])
+    if provider == 'wyscout':
+        df['period'] = df['period'].map(WYSCOUT_PERIODS).astype('int8')
+    if orient_teams:
+        df = orient(df, attacking_left(df))
+    df['provider'] = pd.Categorical([provider] * len(df), categories=list(PROVIDERS))
+    return schema.compact(df, schema.STATSBOMB_EVENTS)
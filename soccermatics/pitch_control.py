@@ -0,0 +1,156 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from soccermatics.freeze_frames import load_freeze_frames
+
+# Space controlled by each team at the moment of every freeze frame event, evaluated on a grid of
+# the StatsBomb pitch. Voronoi control gives each cell to the closest player. The time-to-intercept
+# surface gives the attacking team a probability of reaching each cell first, from the times both
+# teams' closest players need to run there. Only players in the frame count, and 360 frames only
+# show the players in the camera's view.
+
+PITCH_X = 120
+PITCH_Y = 80
+# a distance larger than the pitch diagonal, used to keep the players of different events apart
+EVENT_OFFSET = 1000.0
+# bump when the cached results change
+CONTROL_VERSION = 1
+
+
+class ControlGrid:
+    # cell centres (cells, 2) of a columns x rows grid of the pitch, numbered row by row from x=0, y=0
+
+    def __init__(self, columns=60, rows=40):
+        self.columns, self.rows = columns, rows
+        x = (np.arange(columns) + 0.5) * PITCH_X / columns
+        y = (np.arange(rows) + 0.5) * PITCH_Y / rows
+        self.centres = np.stack(np.meshgrid(x, y), axis=-1).reshape(-1, 2).astype(np.float32)
+        self.cell_area = PITCH_X * PITCH_Y / (columns * rows)
+
+    def __len__(self):
+        return len(self.centres)
+
+
+def _nearest_numpy(frames, grid, mask, chunk_size=64):
+    # distance from every cell to the closest player in mask and that player's slot, (events, cells)
+    events = len(frames)
+    distance = np.full((events, len(grid)), np.inf, dtype=np.float32)
+    slot = np.full((events, len(grid)), -1, dtype=np.int8)
+    gx, gy = grid.centres[None, :, 0, None], grid.centres[None, :, 1, None]
+    for start in range(0, events, chunk_size):
+        stop = min(start + chunk_size, events)
+        # players outside the mask are moved infinitely far away, so no cell picks them
+        x = np.where(mask[start:stop], frames.xy[start:stop, :, 0], np.inf)[:, None, :]
+        y = np.where(mask[start:stop], frames.xy[start:stop, :, 1], np.inf)[:, None, :]
+        # (events, cells, slots) squared distances, the square root is only taken of the closest
+        squared = (gx - x) ** 2 + (gy - y) ** 2
+        nearest = squared.argmin(axis=2)
+        closest = np.take_along_axis(squared, nearest[..., None], axis=2)[..., 0]
+        distance[start:stop] = np.sqrt(closest)
+        slot[start:stop] = np.where(np.isinf(closest), -1, nearest)
+    return distance, slot
+
+
+def _nearest_kdtree(frames, grid, mask, chunk_size=256):
+    # the same as _nearest_numpy with one KD-tree for the players of all events, each event lifted
+    # to its own height so a cell is only ever matched with the players of its event
+    event, player_slot = np.nonzero(mask)
+    events = len(frames)
+    distance = np.full((events, len(grid)), np.inf, dtype=np.float32)
+    slot = np.full((events, len(grid)), -1, dtype=np.int8)
+    if not len(event):
+        return distance, slot
+    tree = cKDTree(np.column_stack([frames.xy[event, player_slot], event * EVENT_OFFSET]))
+    for start in range(0, events, chunk_size):
+        stop = min(start + chunk_size, events)
+        heights = np.repeat(np.arange(start, stop) * EVENT_OFFSET, len(grid))
+        queries = np.column_stack([np.tile(grid.centres, (stop - start, 1)), heights])
+        d, index = tree.query(queries, distance_upper_bound=EVENT_OFFSET / 2)
+        found = index < len(event)
+        d = d.reshape(stop - start, len(grid))
+        distance[start:stop] = d
+        slot[start:stop] = np.where(found, player_slot[np.minimum(index, len(event) - 1)], -1).reshape(d.shape)
+    return distance, slot
+
+
+NEAREST = {'numpy': _nearest_numpy, 'kdtree': _nearest_kdtree}
+
+
+def _players(frames):
+    return ~np.isnan(frames.xy[..., 0])
+
+
+def voronoi(frames, grid=None, method='numpy'):
+    # slot of the player controlling each cell (events, cells), -1 for events without players
+    grid = ControlGrid() if grid is None else grid
+    return NEAREST[method](frames, grid, _players(frames))[1]
+
+
+def voronoi_areas(frames, grid=None, method='numpy'):
+    # area in square metres of pitch (yards for StatsBomb coordinates) closest to each player (events, slots)
+    grid = ControlGrid() if grid is None else grid
+    owners = voronoi(frames, grid, method)
+    events = np.repeat(np.arange(len(frames)), owners.shape[1])
+    owners = owners.ravel()
+    keep = owners >= 0
+    counts = np.bincount(events[keep] * frames.xy.shape[1] + owners[keep], minlength=frames.xy.shape[1] * len(frames))
+    return (counts.reshape(len(frames), -1) * grid.cell_area).astype(np.float32)
+
+
+def pitch_control(frames, grid=None, speed=5.0, sigma=0.45, method='numpy'):
+    # (events, cells) probability the team making the event reaches each cell first. Time to a cell is
+    # the straight line distance at a constant speed, and the difference between the teams' closest
+    # players is turned into a probability with a logistic of width sigma seconds.
+    grid = ControlGrid() if grid is None else grid
+    players = _players(frames)
+    attacking, _ = NEAREST[method](frames, grid, players & frames.teammate)
+    defending, _ = NEAREST[method](frames, grid, players & ~frames.teammate)
+    with np.errstate(invalid='ignore', over='ignore'):
+        control = 1 / (1 + np.exp(-(defending - attacking) / speed / sigma))
+    # cells neither team has a player for are shared
+    return np.where(np.isinf(attacking) & np.isinf(defending), 0.5, control).astype(np.float32)
+
+
+def control_metrics(frames, grid=None, method='numpy', control=None, **kwargs):
+    # one row per event: share of the pitch the attacking team controls by Voronoi and by pitch control,
+    # and the Voronoi area of the player on the ball. Pass control to reuse a pitch_control surface.
+    grid = ControlGrid() if grid is None else grid
+    areas = voronoi_areas(frames, grid, method)
+    if control is None:
+        control = pitch_control(frames, grid, method=method, **kwargs)
+    total = PITCH_X * PITCH_Y
+    return pd.DataFrame({
+        'voronoi_share': (areas * frames.teammate).sum(axis=1) / total,
+        'control_share': control.mean(axis=1),
+        'actor_area': (areas * frames.actor).sum(axis=1),
+    }, index=pd.Index(frames.ids, name='id'))
+
+
+def load_pitch_control(parser, match_id, columns=60, rows=40, refresh=False, method='numpy', speed=5.0, sigma=0.45):
+    # control metrics and the pitch control surface (events, rows, columns) of every 360 event of a match,
+    # cached next to the freeze frame arrays for each grid resolution, method, speed and sigma
+    frames = load_freeze_frames(parser, match_id)
+    directory = os.path.join(parser.cache_dir, 'three-sixty', str(match_id))
+    path = os.path.join(directory, f'control_{columns}x{rows}_{method}_speed{speed:g}_sigma{sigma:g}.npz')
+    arrays = os.path.join(directory, 'arrays.npz')
+    if not refresh and os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(arrays):
+        with np.load(path) as data:
+            if int(data['version']) == CONTROL_VERSION:
+                metrics = pd.DataFrame({name: data[name] for name in ('voronoi_share', 'control_share', 'actor_area')},
+                                       index=pd.Index(frames.ids, name='id'))
+                return metrics, data['surface'].astype(np.float32)
+    grid = ControlGrid(columns, rows)
+    control = pitch_control(frames, grid, speed=speed, sigma=sigma, method=method)
+    metrics = control_metrics(frames, grid, method=method, control=control)
+    # float16 keeps the probabilities to 3 decimals at half the size, the rounded surface is returned
+    # here as well so a call gives the same numbers whether the cache was used or not
+    surface = control.reshape(len(frames), rows, columns).astype(np.float16)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, version=CONTROL_VERSION, surface=surface,
+                 **{name: metrics[name].to_numpy() for name in metrics.columns})
+    os.replace(tmp, path)
+    return metrics, surface.astype(np.float32)
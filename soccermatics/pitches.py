@@ -0,0 +1,112 @@
+import hashlib
+import os
+
+import matplotlib
+import mplsoccer
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mplsoccer import Pitch, VerticalPitch
+
+
+def headless_figure(figsize=(10, 7), dpi=100):
+    # a figure drawn with Agg that is not registered with pyplot, so batch jobs never open windows
+    # and figures are freed as soon as they are dropped
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+class PitchBackground:
+    # A pitch drawn once and kept as an RGBA image. draw() puts the image on an axes with the pitch's
+    # data limits, so the data layers can be plotted on top with the usual pitch methods without
+    # redrawing the stripes, arcs and lines.
+
+    def __init__(self, vertical=False, figsize=(4, 3), dpi=100, **pitch_kwargs):
+        self.pitch = (VerticalPitch if vertical else Pitch)(**pitch_kwargs)
+        fig = headless_figure(figsize, dpi)
+        ax = fig.add_axes((0, 0, 1, 1))
+        self.pitch.draw(ax=ax)
+        fig.canvas.draw()
+        # keep only the pixels inside the axes, the equal aspect leaves margins in the figure
+        image = np.asarray(fig.canvas.buffer_rgba())
+        x0, y0, x1, y1 = np.round(ax.get_window_extent().extents).astype(int)
+        self.image = image[image.shape[0] - y1:image.shape[0] - y0, x0:x1].copy()
+        self.xlim = ax.get_xlim()
+        self.ylim = ax.get_ylim()
+        self.aspect = ax.get_aspect()
+
+    def draw(self, ax):
+        ax.imshow(self.image, extent=(*self.xlim, *self.ylim), zorder=0, interpolation='antialiased')
+        ax.set_xlim(self.xlim)
+        ax.set_ylim(self.ylim)
+        ax.set_aspect(self.aspect)
+        ax.axis('off')
+        return ax
+
+    @classmethod
+    def load(cls, path):
+        # a background saved with save(), without drawing the pitch again
+        with np.load(path) as data:
+            background = cls.__new__(cls)
+            background.image = data['image']
+            background.xlim = tuple(data['xlim'])
+            background.ylim = tuple(data['ylim'])
+            aspect = str(data['aspect'])
+        background.aspect = aspect if aspect in ('auto', 'equal') else float(aspect)
+        return background
+
+    def save(self, path):
+        # uncompressed so loading is a copy of the pixels, written to a temporary file first so
+        # processes sharing the cache never read half a file
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, image=self.image, xlim=np.asarray(self.xlim), ylim=np.asarray(self.ylim),
+                     aspect=np.asarray(str(self.aspect)))
+        os.replace(tmp, path)
+
+
+# pitches are kept in memory per process and as .npz files in data/.cache/pitches
+PITCH_CACHE_DIR = os.path.join('data', '.cache', 'pitches')
+_BACKGROUNDS = {}
+
+
+def background_key(vertical=False, figsize=(4, 3), dpi=100, **pitch_kwargs):
+    # the constructor arguments and figure size, with the library versions as the drawing may change between them
+    arguments = (bool(vertical), tuple(figsize), dpi, sorted(pitch_kwargs.items()),
+                 mplsoccer.__version__, matplotlib.__version__)
+    return hashlib.sha1(repr(arguments).encode()).hexdigest()[:16]
+
+
+def pitch_background(vertical=False, figsize=(4, 3), dpi=100, cache_dir=None, refresh=False, **pitch_kwargs):
+    # The pitch for these arguments and size, drawn the first time it is asked for.
+    # Later calls in the process reuse it from memory, later processes load it from cache_dir
+    # (data/.cache/pitches in the current working directory by default). Pass cache_dir=False to keep it in memory only.
+    key = background_key(vertical, figsize, dpi, **pitch_kwargs)
+    if key in _BACKGROUNDS and not refresh:
+        return _BACKGROUNDS[key]
+    path = None
+    if cache_dir is not False:
+        cache_dir = os.path.join(os.getcwd(), PITCH_CACHE_DIR) if cache_dir is None else cache_dir
+        path = os.path.join(cache_dir, f'{key}.npz')
+    if path is not None and os.path.exists(path) and not refresh:
+        background = PitchBackground.load(path)
+    else:
+        background = PitchBackground(vertical, figsize, dpi, **pitch_kwargs)
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            background.save(path)
+    # the pitch object is cheap to build and is needed to plot in its coordinates
+    background.pitch = (VerticalPitch if vertical else Pitch)(**pitch_kwargs)
+    _BACKGROUNDS[key] = background
+    return background
+
+
+def pitch_figure(vertical=False, figsize=(4, 3), dpi=100, cache_dir=None, refresh=False, **pitch_kwargs):
+    # Drop-in for Pitch(**pitch_kwargs).draw(figsize=figsize) that reuses the cached background.
+    # Returns the pitch, to plot the data layers with, the headless figure and its axes.
+    background = pitch_background(vertical, figsize, dpi, cache_dir=cache_dir, refresh=refresh, **pitch_kwargs)
+    fig = headless_figure(figsize, dpi)
+    ax = fig.add_axes((0, 0, 1, 1))
+    background.draw(ax)
+    return background.pitch, fig, ax
@@ -0,0 +1,121 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from mplsoccer import Pitch
+
+from soccermatics.pitches import headless_figure, pitch_background
+
+TEAM_COLORS = ('red', 'blue')
+
+
+def mirror(pitch, x, y):
+    # flip coordinates to the other end of the pitch, eg. so the second team attacks right to left
+    return pitch.dim.left + pitch.dim.right - np.asarray(x), pitch.dim.top + pitch.dim.bottom - np.asarray(y)
+
+
+def shot_map(shots, pitch, ax, teams=None, colors=TEAM_COLORS, size=500, goal_alpha=1, miss_alpha=0.2, fontsize=12,
+             scale=1000):
+    # Shot map with the first team attacking left to right and the second team mirrored.
+    # Shots are drawn with one scatter per (team, goal or not), and only goals are annotated.
+    if teams is None:
+        teams = shots['team_name'].unique()
+    x = shots['x'].to_numpy(float)
+    y = shots['y'].to_numpy(float)
+    is_goal = (shots['outcome_name'] == 'Goal').to_numpy()
+    # size may be a column name, eg. an xG column whose values are multiplied by scale, or a scalar
+    sizes = shots[size].to_numpy(float) * scale if isinstance(size, str) else np.broadcast_to(size, len(shots))
+
+    collections = {}
+    for i, (team, color) in enumerate(zip(teams, colors)):
+        is_team = (shots['team_name'] == team).to_numpy()
+        team_x, team_y = (x, y) if i == 0 else mirror(pitch, x, y)
+        for goal, alpha in ((True, goal_alpha), (False, miss_alpha)):
+            mask = is_team & (is_goal == goal)
+            if mask.any():
+                collections[team, goal] = pitch.scatter(team_x[mask], team_y[mask], s=sizes[mask], alpha=alpha,
+                                                        color=color, ax=ax)
+        for shot_x, shot_y, player in zip(team_x[is_team & is_goal], team_y[is_team & is_goal],
+                                          shots['player_name'].to_numpy()[is_team & is_goal]):
+            pitch.annotate(player, (shot_x + 1, shot_y - 2), ax=ax, fontsize=fontsize)
+    return collections
+
+
+def save_shot_maps(shots, out_dir, by='match_id', pitch=None, figsize=(10, 7), dpi=100, **kwargs):
+    # Render one shot map per group (by default per match) to out_dir/<group>.png.
+    # Returns the render time of each figure in seconds.
+    if pitch is None:
+        pitch = Pitch(pitch_color='grass', line_color='white', stripe=True, goal_type='box')
+    os.makedirs(out_dir, exist_ok=True)
+    timings = {}
+    for key, match_shots in shots.groupby(by, sort=False):
+        start = time.perf_counter()
+        fig = headless_figure(figsize)
+        ax = fig.add_subplot()
+        pitch.draw(ax=ax)
+        shot_map(match_shots, pitch, ax, **kwargs)
+        name = '_'.join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+        fig.savefig(os.path.join(out_dir, f'{name}.png'), dpi=dpi)
+        timings[key] = time.perf_counter() - start
+    return pd.Series(timings, name='seconds')
+
+
+# pitch used for the panels of the pass map grids, as in Plotting Passes.py
+PASS_GRID_PITCH = {'line_color': 'black', 'pad_top': 20}
+
+
+def pass_grid(passes, title=None, ncols=4, panel_size=(3, 2.4), pitch_kwargs=PASS_GRID_PITCH, color='blue'):
+    # One pass map per player, with as many rows as the players need.
+    # Each panel shows a copy of a pitch rendered once per process instead of drawing the pitch again.
+    names = passes['player_name'].unique()
+    nrows = max(1, math.ceil(len(names) / ncols))
+    title_height = 0.6 if title else 0
+    fig = headless_figure((ncols * panel_size[0], nrows * panel_size[1] + title_height))
+    axs = fig.subplots(nrows, ncols, squeeze=False)
+    background = pitch_background(figsize=panel_size, **pitch_kwargs)
+    pitch = background.pitch
+    for name, ax in zip(names, axs.flat):
+        background.draw(ax)
+        player_passes = passes.loc[passes['player_name'] == name]
+        ax.text(60, -10, name, ha='center', va='center', fontsize=10)
+        pitch.scatter(player_passes.x, player_passes.y, alpha=0.2, s=50, color=color, ax=ax)
+        pitch.arrows(player_passes.x, player_passes.y, player_passes.end_x, player_passes.end_y, color=color, ax=ax, width=1)
+    # remove extra axes
+    for ax in axs.flat[len(names):]:
+        ax.remove()
+    if title:
+        fig.suptitle(title, fontsize=20)
+    fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=1 - title_height / fig.get_figheight() - 0.01,
+                        wspace=0.05, hspace=0.05)
+    return fig
+
+
+def _render_pass_grid(args):
+    # runs in a worker process, the figure is written to disk and only the render time is sent back
+    passes, path, title, kwargs = args
+    kwargs = dict(kwargs)
+    dpi = kwargs.pop('dpi', 100)
+    start = time.perf_counter()
+    fig = pass_grid(passes, title=title, **kwargs)
+    fig.savefig(path, dpi=dpi)
+    return time.perf_counter() - start
+
+
+def save_pass_grids(passes, out_dir, by=('match_id', 'team_name'), processes=None, **kwargs):
+    # Render a pass map grid for every group of passes (by default every team in every match)
+    # to out_dir/<group>.png with a process pool. Returns the render time of each figure in seconds,
+    # the throughput in figures per second is len(timings) / wall time.
+    by = [by] if isinstance(by, str) else list(by)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs, keys = [], []
+    for key, group in passes.groupby(by, sort=False):
+        key = key if isinstance(key, tuple) else (key,)
+        name = '_'.join(str(k) for k in key).replace(' ', '_').replace("'", '')
+        jobs.append((group, os.path.join(out_dir, f'{name}.png'), ' '.join(str(k) for k in key), kwargs))
+        keys.append(key)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        seconds = list(pool.map(_render_pass_grid, jobs))
+    return pd.Series(seconds, index=pd.MultiIndex.from_tuples(keys, names=by), name='seconds')
@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from soccermatics.tags import has_tags
+
+# Possession chains: runs of consecutive events in which one team has the ball. Events are ordered
+# within each match and period, the team in possession is carried forward over events that don't
+# show who has the ball (duels, pressures, fouls), and a chain starts wherever that team, the match
+# or the period changes. Every step is an array operation over the whole table.
+
+OUTCOMES = ('turnover', 'shot', 'goal')
+# column names and events that show which team has the ball, for each provider
+PROVIDERS = {
+    'statsbomb': {'match': 'match_id', 'period': 'period', 'order': 'index', 'team': 'possession_team_id',
+                  'type': 'type_name', 'on_ball': None},
+    'wyscout': {'match': 'matchId', 'period': 'matchPeriod', 'order': 'eventSec', 'team': 'teamId',
+                'type': 'eventName', 'on_ball': ('Pass', 'Shot', 'Free Kick', 'Others on the ball')},
+}
+
+
+def _forward_fill(values, valid):
+    # values[i] replaced by the last valid value up to i, -1 before the first
+    last = np.where(valid, np.arange(len(values)), -1)
+    last = np.maximum.accumulate(last)
+    return np.where(last >= 0, values[np.maximum(last, 0)], -1)
+
+
+class Chains:
+    # Chains in offsets + values layout: the rows of chain i are values[offsets[i]:offsets[i + 1]],
+    # in event order, with the team, match and outcome code (see OUTCOMES) of each chain.
+
+    def __init__(self, offsets, values, team, match, outcome):
+        self.offsets = offsets
+        self.values = values
+        self.team = team
+        self.match = match
+        self.outcome = outcome
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def where(self, outcome=None, team=None, min_length=1):
+        # numbers of the chains with the given outcome name, team and length
+        mask = self.lengths >= min_length
+        if outcome is not None:
+            mask &= self.outcome == OUTCOMES.index(outcome)
+        if team is not None:
+            mask &= self.team == team
+        return np.flatnonzero(mask)
+
+    def rows(self, chains):
+        # positions in the event table of the events of the given chains, one slice per chain
+        chains = np.asarray(chains)
+        starts, lengths = self.offsets[chains], self.lengths[chains]
+        # one arange over all chains: the start of each chain repeated, plus the position within it
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self.values[np.repeat(starts, lengths) + within]
+
+    def save(self, path):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, offsets=self.offsets, values=self.values, team=self.team, match=self.match,
+                     outcome=self.outcome)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['offsets'], data['values'], data['team'], data['match'], data['outcome'])
+
+
+def possession_chains(events, provider):
+    # Chains of an event table of either provider, with possession_id, chain_length and chain_outcome
+    # columns added to a copy of the table. possession_id numbers the chains of the whole table.
+    columns = PROVIDERS[provider]
+    order = np.lexsort([events[columns['order']].to_numpy(), events[columns['period']].to_numpy(),
+                        events[columns['match']].to_numpy()])
+    match = events[columns['match']].to_numpy()[order]
+    period = pd.factorize(events[columns['period']])[0][order]
+    team = events[columns['team']].to_numpy()[order]
+    kind = events[columns['type']].to_numpy()[order]
+    if columns['on_ball'] is not None:
+        # the team of the last event on the ball, within the same match and period
+        on_ball = np.isin(kind, columns['on_ball'])
+        segment = np.r_[True, (match[1:] != match[:-1]) | (period[1:] != period[:-1])]
+        segment_id = np.cumsum(segment)
+        filled = _forward_fill(team, on_ball)
+        # an event before the first on-ball event of its period keeps its own team
+        start_of_fill = _forward_fill(segment_id, on_ball)
+        team = np.where(start_of_fill == segment_id, filled, team)
+
+    starts = np.r_[True, (team[1:] != team[:-1]) | (match[1:] != match[:-1]) | (period[1:] != period[:-1])]
+    offsets = np.r_[np.flatnonzero(starts), len(order)]
+    lengths = np.diff(offsets)
+
+    is_shot = kind == 'Shot'
+    if provider == 'statsbomb':
+        is_goal = is_shot & (events['outcome_name'].to_numpy()[order] == 'Goal')
+    else:
+        is_goal = is_shot & has_tags(events, 'goal')[order]
+    # the outcome of a chain is the best of its events: 2 for a goal, 1 for a shot, 0 otherwise
+    code = np.maximum(is_shot.astype(np.int8), 2 * is_goal.astype(np.int8))
+    outcome = np.maximum.reduceat(code, offsets[:-1]) if len(order) else np.zeros(0, dtype=np.int8)
+
+    chains = Chains(offsets, order, team[offsets[:-1]], match[offsets[:-1]], outcome)
+    ids = np.empty(len(order), dtype=np.int32)
+    ids[order] = np.repeat(np.arange(len(lengths)), lengths)
+    events = events.copy(deep=False)
+    events['possession_id'] = ids
+    events['chain_length'] = lengths[ids].astype(np.int32)
+    events['chain_outcome'] = pd.Categorical.from_codes(outcome[ids], categories=list(OUTCOMES))
+    return events, chains
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from soccermatics.tags import has_tags
+
+# Event queries, eg. EventQuery(df).where(type='Pass', team="England Women's", exclude_sub='Throw-in', successful=True)
+# Every keyword is a predicate on one column, prefixed with exclude_ it is negated. Columns are factorized
+# once into integer codes (categoricals already are), so a predicate is a lookup of the codes in a boolean
+# table of the wanted values. The masks of single predicates and of combined queries are memoized with
+# least recently used eviction, and a combined query is the intersection of the masks of its predicates.
+# The table is assumed not to change, build a new EventQuery after editing it.
+
+# keyword -> column, the StatsBomb name first and the Wyscout one second. Any column name works as a keyword too.
+FIELDS = {
+    'type': ('type_name', 'eventName'),
+    'sub': ('sub_type_name', 'subEventName'),
+    'team': ('team_name', 'teamId'),
+    'player': ('player_name', 'playerId'),
+    'match': ('match_id', 'matchId'),
+    'period': ('period', 'matchPeriod'),
+    'outcome': ('outcome_name',),
+    'position': ('position_name',),
+}
+EXCLUDE = 'exclude_'
+
+
+class EventQuery:
+
+    def __init__(self, events, maxsize=32):
+        self.events = events
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._codes = {}
+        self._masks = OrderedDict()
+
+    def column(self, field):
+        if field in self.events.columns:
+            return field
+        for column in FIELDS.get(field, ()):
+            if column in self.events.columns:
+                return column
+        raise KeyError(f'no column for {field!r} in the event table')
+
+    def codes(self, column):
+        # integer codes and categories of a column, missing values have code -1
+        if column not in self._codes:
+            series = self.events[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series)
+            self._codes[column] = codes, pd.Index(categories)
+        return self._codes[column]
+
+    def _successful(self):
+        # StatsBomb leaves the outcome of completed passes empty, Wyscout tags accurate events
+        if 'outcome_name' in self.events.columns:
+            return 'isna', 'outcome_name'
+        if 'tag_mask' in self.events.columns:
+            return 'tags', 'accurate'
+        raise KeyError('successful needs an outcome_name or tag_mask column')
+
+    def _keys(self, predicates):
+        keys = set()
+        for field, value in predicates.items():
+            negate = field.startswith(EXCLUDE)
+            if negate:
+                field = field[len(EXCLUDE):]
+            if field == 'successful':
+                key = self._successful()
+                negate = negate == bool(value)
+            else:
+                values = value if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+                key = ('isin', self.column(field), frozenset(values))
+            keys.add(('not', key) if negate else key)
+        return frozenset(keys)
+
+    def _compute(self, key):
+        if isinstance(key, frozenset):
+            # intersection of the cached masks of the predicates, in one buffer
+            masks = [self._mask(k) for k in key]
+            mask = masks[0].copy()
+            for other in masks[1:]:
+                np.logical_and(mask, other, out=mask)
+            return mask
+        kind, column = key[:2]
+        if kind == 'not':
+            return ~self._mask(column)
+        if kind == 'tags':
+            return has_tags(self.events, column)
+        codes, categories = self.codes(column)
+        if kind == 'isna':
+            return codes < 0
+        # the extra last entry stays False and is what the -1 code of missing values looks up
+        wanted = categories.get_indexer(list(key[2]))
+        table = np.zeros(len(categories) + 1, dtype=bool)
+        table[wanted[wanted >= 0]] = True
+        return table[codes]
+
+    def _mask(self, key):
+        if key in self._masks:
+            self._masks.move_to_end(key)
+            self.hits += 1
+            return self._masks[key]
+        self.misses += 1
+        mask = self._compute(key)
+        # the same array is handed out on every hit
+        mask.flags.writeable = False
+        self._masks[key] = mask
+        if len(self._masks) > self.maxsize:
+            self._masks.popitem(last=False)
+        return mask
+
+    def mask(self, **predicates):
+        # read-only boolean array of the events matching all the predicates
+        keys = self._keys(predicates)
+        if not keys:
+            return np.ones(len(self.events), dtype=bool)
+        if len(keys) == 1:
+            key, = keys
+            return self._mask(key)
+        return self._mask(keys)
+
+    def where(self, **predicates):
+        return self.events.loc[self.mask(**predicates)]
+
+    def count(self, **predicates):
+        return int(np.count_nonzero(self.mask(**predicates)))
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._masks), 'maxsize': self.maxsize}
+
+    def clear(self):
+        self._codes.clear()
+        self._masks.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,176 @@
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+from matplotlib import font_manager
+from mplsoccer import Radar
+
+from soccermatics import wyscout
+from soccermatics.cache import cached_frame
+from soccermatics.pitches import headless_figure
+from soccermatics.tags import has_any_tag, has_tags
+
+# bump when the metrics change so old caches are rebuilt
+PERCENTILES_VERSION = 2
+
+ROBOTO_URL = 'https://raw.githubusercontent.com/googlefonts/roboto/main/src/hinted/Roboto-Regular.ttf'
+ROBOTO_BOLD_URL = 'https://raw.githubusercontent.com/googlefonts/roboto/main/src/hinted/Roboto-Bold.ttf'
+
+# shots from set pieces are Free Kick events, the goal tag is also on the goalkeeper's events of a goal
+SHOT_SUB_EVENTS = ('Shot', 'Free kick shot', 'Penalty')
+
+# per 90 metrics computed from the Wyscout events, each is a function of the events giving a boolean mask
+METRICS = {
+    'Shots': lambda e: e['eventName'] == 'Shot',
+    'Goals': lambda e: e['subEventName'].isin(SHOT_SUB_EVENTS) & has_tags(e, 'goal'),
+    'Assists': lambda e: has_tags(e, 'assist'),
+    'Key Passes': lambda e: has_tags(e, 'key_pass'),
+    'Passes': lambda e: e['eventName'] == 'Pass',
+    'Accurate Passes': lambda e: (e['eventName'] == 'Pass') & has_tags(e, 'accurate'),
+    'Crosses': lambda e: e['subEventName'] == 'Cross',
+    'Take Ons': lambda e: (e['eventName'] == 'Duel') & has_any_tag(e, 'take_on_left', 'take_on_right'),
+    'Duels Won': lambda e: (e['eventName'] == 'Duel') & has_tags(e, 'won'),
+    'Interceptions': lambda e: has_tags(e, 'interception'),
+}
+
+
+def minutes_played(matches, events):
+    # Minutes played by each player in each match, from the Wyscout lineups and substitutions.
+    # A match lasts as long as its last event in each period, so stoppage time is counted.
+    period_end = events.groupby(['matchId', 'matchPeriod'], observed=True)['eventSec'].max()
+    length = period_end.groupby(level='matchId').sum() / 60
+    rows = []
+    # one iteration per team in each match, there are no per-event loops
+    for match_id, teams_data in zip(matches['wyId'], matches['teamsData']):
+        for team in teams_data.values():
+            formation = team.get('formation') or {}
+            substitutions = formation.get('substitutions')
+            # Wyscout uses the string 'null' for a team without substitutions
+            substitutions = substitutions if isinstance(substitutions, list) else []
+            off = {sub['playerOut']: sub['minute'] for sub in substitutions}
+            for player in formation.get('lineup', []):
+                rows.append((match_id, player['playerId'], 0, off.get(player['playerId'], np.nan)))
+            for sub in substitutions:
+                rows.append((match_id, sub['playerIn'], sub['minute'], off.get(sub['playerIn'], np.nan)))
+    played = pd.DataFrame(rows, columns=['matchId', 'playerId', 'start', 'end'])
+    played['end'] = played['end'].fillna(played['matchId'].map(length))
+    played['minutes'] = (played['end'] - played['start']).clip(lower=0)
+    return played[['matchId', 'playerId', 'minutes']]
+
+
+def player_metrics(events, minutes, min_minutes=900):
+    # per 90 value of every metric for each player with at least min_minutes, plus pass accuracy in %
+    # every metric is a boolean column, so all are counted in one groupby
+    flags = pd.DataFrame({name: metric(events) for name, metric in METRICS.items()})
+    flags['playerId'] = events['playerId'].to_numpy()
+    totals = flags.groupby('playerId').sum()
+    total_minutes = minutes.groupby('playerId')['minutes'].sum()
+    total_minutes = total_minutes.loc[total_minutes >= min_minutes]
+    totals = totals.reindex(total_minutes.index, fill_value=0)
+
+    metrics = totals.div(total_minutes, axis=0) * 90
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics['Pass Accuracy'] = (totals['Accurate Passes'] / totals['Passes'] * 100).fillna(0)
+    metrics = metrics.drop(columns='Accurate Passes')
+    metrics.insert(0, 'minutes', total_minutes)
+    return metrics
+
+
+def percentile_ranks(metrics):
+    # league percentile of each player for each metric
+    ranks = metrics.drop(columns='minutes').rank(pct=True) * 100
+    ranks.insert(0, 'minutes', metrics['minutes'])
+    return ranks
+
+
+def load_percentiles(competition='England', min_minutes=900, root=None, refresh=False):
+    # per 90 metrics and their percentile ranks for a competition, cached next to its events file
+    # and rebuilt when the events or the matches (which give the minutes played) change
+    # columns are the metrics and '<metric> percentile', indexed by playerId
+    def build(path):
+        events = wyscout.load_events(competition, root=root)
+        matches = wyscout.load_matches(competition, root=root)
+        metrics = player_metrics(events, minutes_played(matches, events), min_minutes)
+        ranks = percentile_ranks(metrics).drop(columns='minutes').add_suffix(' percentile')
+        return metrics.join(ranks).reset_index()
+
+    path = wyscout.data_path('events', f'events_{competition}.json', root=root)
+    matches = wyscout.data_path('matches', f'matches_{competition}.json', root=root)
+    table = cached_frame(path, build, refresh=refresh, version=PERCENTILES_VERSION,
+                         name=f'percentiles_{competition}_{min_minutes}', depends=(matches,))
+    return table.set_index('playerId')
+
+
+def font_path(url, font_dir=None):
+    # FontManager downloads the font on every call, this keeps one copy in data/fonts
+    if font_dir is None:
+        font_dir = os.path.join(os.getcwd(), 'data', 'fonts')
+    path = os.path.join(font_dir, os.path.basename(url).split('?')[0])
+    if not os.path.exists(path):
+        os.makedirs(font_dir, exist_ok=True)
+        with urlopen(url) as response:
+            data = response.read()
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+@lru_cache(maxsize=None)
+def font(url=ROBOTO_URL, font_dir=None):
+    # font properties loaded once per process, falls back to the matplotlib default font when offline
+    try:
+        return font_manager.FontProperties(fname=font_path(url, font_dir))
+    except OSError as error:
+        warnings.warn(f'could not load {url} ({error}), using the default font')
+        return font_manager.FontProperties()
+
+
+def radar_figure(name, values, params, font_url=ROBOTO_URL, bold_font_url=ROBOTO_BOLD_URL, font_dir=None):
+    # radar of a player's percentile ranks (0 to 100) for each param
+    regular, bold = font(font_url, font_dir), font(bold_font_url, font_dir)
+    radar = Radar(params, min_range=[0] * len(params), max_range=[100] * len(params),
+                  round_int=[True] * len(params), num_rings=4, ring_width=1, center_circle_radius=1)
+    fig = headless_figure((9, 10))
+    ax = fig.add_axes((0, 0, 1, 0.9))
+    radar.setup_axis(ax=ax)
+    radar.draw_circles(ax=ax, facecolor='#ffb2b2', edgecolor='#fc5f5f')
+    radar.draw_radar(values, ax=ax, kwargs_radar={'facecolor': '#aa65b2'}, kwargs_rings={'facecolor': '#66d8ba'})
+    radar.draw_range_labels(ax=ax, fontsize=15, fontproperties=regular)
+    radar.draw_param_labels(ax=ax, fontsize=15, fontproperties=regular)
+    fig.text(0.5, 0.95, name, ha='center', va='center', fontsize=25, fontproperties=bold)
+    return fig
+
+
+def _render_radars(args):
+    # runs in a worker process, the fonts are loaded by the first radar and reused by the rest
+    players, params, out_dir, kwargs = args
+    start = time.perf_counter()
+    for player_id, name, values in players:
+        fig = radar_figure(name, values, params, **kwargs)
+        fig.savefig(os.path.join(out_dir, f'{player_id}.png'))
+    return time.perf_counter() - start
+
+
+def save_radars(percentiles, names, out_dir, params=None, processes=None, chunk_size=20, **kwargs):
+    # Render the percentile radar of every player in percentiles to out_dir/<playerId>.png with a process pool.
+    # names maps playerId to the name shown on the radar. Returns the number of radars and the wall time.
+    if params is None:
+        params = [column[:-len(' percentile')] for column in percentiles.columns if column.endswith(' percentile')]
+    values = percentiles[[f'{param} percentile' for param in params]].to_numpy()
+    players = [(player_id, names.get(player_id, str(player_id)), player_values)
+               for player_id, player_values in zip(percentiles.index, values)]
+    # fetch the fonts once before starting the workers, so they all read the local copy
+    font(kwargs.get('font_url', ROBOTO_URL), kwargs.get('font_dir'))
+    font(kwargs.get('bold_font_url', ROBOTO_BOLD_URL), kwargs.get('font_dir'))
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(players[i:i + chunk_size], params, out_dir, kwargs) for i in range(0, len(players), chunk_size)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        list(pool.map(_render_radars, jobs))
+    return len(players), time.perf_counter() - start
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Compact dtypes for the event tables. Names are categoricals, ie. small integer codes plus one
+# lookup table of names, coordinates are float32 and ids are the smallest integers that hold them.
+# Integer columns with missing values get the nullable version of their dtype, eg. int16 -> Int16.
+
+WYSCOUT_EVENTS = {
+    'eventId': 'int8', 'subEventId': 'int16', 'eventName': 'category', 'subEventName': 'category',
+    'matchPeriod': 'category', 'eventSec': 'float32', 'id': 'int64', 'matchId': 'int32',
+    'playerId': 'int32', 'teamId': 'int32', 'x': 'float32', 'y': 'float32', 'end_x': 'float32', 'end_y': 'float32',
+}
+
+STATSBOMB_EVENTS = {
+    'index': 'int32', 'period': 'int8', 'minute': 'int16', 'second': 'int8', 'possession': 'int16',
+    'match_id': 'int32', 'team_id': 'int32', 'possession_team_id': 'int32', 'player_id': 'int32',
+    'pass_recipient_id': 'int32', 'substitution_replacement_id': 'int32',
+    'x': 'float32', 'y': 'float32', 'end_x': 'float32', 'end_y': 'float32', 'end_z': 'float32',
+    'duration': 'float32', 'pass_length': 'float32', 'pass_angle': 'float32', 'shot_statsbomb_xg': 'float32',
+}
+
+STATSBOMB_FRAMES = {'match_id': 'int32', 'x': 'float32', 'y': 'float32'}
+
+NULLABLE = {'int8': 'Int8', 'int16': 'Int16', 'int32': 'Int32', 'int64': 'Int64'}
+
+
+def fitting_int(series, dtype):
+    # dtype, or the next wider integer dtype if the values don't fit in it, astype would wrap them around
+    # and turn an id into a different one
+    if series.isna().all():
+        return dtype
+    low, high = series.min(), series.max()
+    widths = list(NULLABLE)
+    for candidate in widths[widths.index(dtype):]:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return candidate
+    return 'int64'
+
+
+def column_dtype(column, dtypes, names=False):
+    # the compact dtype of a column, the StatsBomb tables have more *_id and *_name columns than
+    # are listed so with names=True the remaining numeric ids are small ints and names categoricals,
+    # compact widens the ints when the values don't fit
+    if column in dtypes:
+        return dtypes[column]
+    if names and column.endswith('_name'):
+        return 'category'
+    if names and column.endswith('_id'):
+        return 'int16'
+    return None
+
+
+def compact(df, dtypes, names=False):
+    # a copy of df with the compact dtypes applied to the columns it has
+    df = df.copy(deep=False)
+    for column in df.columns:
+        dtype = column_dtype(column, dtypes, names)
+        if dtype is None or df[column].dtype == dtype:
+            continue
+        series = df[column]
+        if dtype in NULLABLE:
+            if series.dtype.kind not in 'iuf':
+                # string ids, eg. the event ids in shot_key_pass_id
+                continue
+            dtype = fitting_int(series, dtype)
+            if series.hasnans:
+                dtype = NULLABLE[dtype]
+            elif series.dtype.kind == 'f':
+                # float ids without missing values, eg. player_id of a match with no missing players
+                series = series.astype('int64')
+        df[column] = series.astype(dtype)
+    return df
+
+
+def concat(frames):
+    # pd.concat turns categoricals with different categories into strings, so the categories of every
+    # frame are unioned first and the codes are kept
+    frames = list(frames)
+    if not frames:
+        return pd.DataFrame()
+    categorical = [column for column, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    for column in categorical:
+        series = [df[column] for df in frames if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype)]
+        categories = union_categoricals(series, ignore_order=True).categories
+        frames = [df.assign(**{column: df[column].cat.set_categories(categories)})
+                  if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype) else df
+                  for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def lookup_table(df, code, name):
+    # side table of the names of integer coded ids, eg. lookup_table(events, 'player_id', 'player_name')
+    table = df[[code, name]].dropna().drop_duplicates(code).set_index(code)[name]
+    return table.astype(str).sort_index()
+
+
+def memory_report(before, after):
+    # memory_usage(deep=True) in MB of the columns of two versions of the same table
+    report = pd.DataFrame({'before': before.memory_usage(index=False, deep=True),
+                           'after': after.memory_usage(index=False, deep=True)}) / 2 ** 20
+    report['before dtype'] = before.dtypes.astype(str)
+    report['after dtype'] = after.dtypes.reindex(report.index).astype(str)
+    report.loc['total'] = [report['before'].sum(), report['after'].sum(), '', '']
+    return report
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from soccermatics.tags import has_tags
+
+
+def sign_test_pvalues(positive, negative):
+    # exact two-sided sign test p-values for arrays of counts, the same as statsmodels sign_test
+    # the binomial distribution with p=0.5 is symmetric, so the p-value is twice the smaller tail
+    positive, negative = np.asarray(positive), np.asarray(negative)
+    n = positive + negative
+    return np.minimum(1.0, 2 * stats.binom.cdf(np.minimum(positive, negative), n, 0.5))
+
+
+def footedness(events, players=None, min_shots=10, alpha=0.05, method='fdr_bh'):
+    # Sign test of left against right foot shots for every player with at least min_shots of them.
+    # Shots are counted per player in one grouped pass and all p-values are computed together,
+    # then corrected for testing many players (method is any statsmodels multipletests method).
+    # Players whose shots are balanced enough to be called ambidextrous come first.
+    shots = events.loc[events['eventName'] == 'Shot', ['playerId']]
+    shots['left'] = has_tags(events.loc[shots.index], 'left_foot')
+    shots['right'] = has_tags(events.loc[shots.index], 'right_foot')
+    table = shots.groupby('playerId')[['left', 'right']].sum()
+    table['shots'] = table['left'] + table['right']
+    table = table.loc[table['shots'] >= min_shots]
+
+    table['pvalue'] = sign_test_pvalues(table['left'].to_numpy(), table['right'].to_numpy())
+    if len(table):
+        reject, adjusted, _, _ = multipletests(table['pvalue'], alpha=alpha, method=method)
+    else:
+        reject, adjusted = np.array([], dtype=bool), np.array([])
+    table['pvalue_adjusted'] = adjusted
+    table['ambidextrous'] = ~reject
+    if players is not None:
+        table = table.join(players.set_index('wyId')['shortName'])
+    return table.sort_values(['pvalue_adjusted', 'shots'], ascending=False)
+
+
+def _chunks(n_resamples, chunk_size):
+    # sizes of the batches of replicates, chunk_size bounds the memory of each batch
+    chunk_size = chunk_size or n_resamples
+    return [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+
+
+def _pvalue(replicates, observed, n_resamples, alternative):
+    # replicates is a list of arrays of the null statistic, one per chunk
+    if alternative == 'two-sided':
+        extreme = sum(int((np.abs(r) >= abs(observed)).sum()) for r in replicates)
+    elif alternative == 'greater':
+        extreme = sum(int((r >= observed).sum()) for r in replicates)
+    else:
+        extreme = sum(int((r <= observed).sum()) for r in replicates)
+    # count the observed arrangement too, so the p-value is never 0
+    return (extreme + 1) / (n_resamples + 1)
+
+
+def permutation_test(a, b, n_resamples=10000, alternative='two-sided', chunk_size=None, seed=None):
+    # Permutation test of the difference in means of two samples, eg. corners per match of two teams.
+    # Each batch of replicates is one (replicates x observations) array, shuffled by argsort of random numbers.
+    # Returns the observed difference and the p-value.
+    rng = np.random.default_rng(seed)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    pooled = np.concatenate([a, b])
+    total = pooled.sum()
+    observed = a.mean() - b.mean()
+    replicates = []
+    for size in _chunks(n_resamples, chunk_size):
+        first = rng.random((size, len(pooled))).argsort(axis=1)[:, :len(a)]
+        sum_a = pooled[first].sum(axis=1)
+        replicates.append(sum_a / len(a) - (total - sum_a) / len(b))
+    return observed, _pvalue(replicates, observed, n_resamples, alternative)
+
+
+def bootstrap_test(a, b, n_resamples=10000, alternative='two-sided', chunk_size=None, seed=None):
+    # Bootstrap test of the difference in means of two samples.
+    # Both samples are shifted to the pooled mean so the null hypothesis holds, then resampled with
+    # replacement, each batch of replicates as one array. Returns the observed difference and the p-value.
+    rng = np.random.default_rng(seed)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    pooled_mean = np.concatenate([a, b]).mean()
+    null_a = a - a.mean() + pooled_mean
+    null_b = b - b.mean() + pooled_mean
+    observed = a.mean() - b.mean()
+    replicates = []
+    for size in _chunks(n_resamples, chunk_size):
+        resample_a = null_a[rng.integers(0, len(a), (size, len(a)))].mean(axis=1)
+        resample_b = null_b[rng.integers(0, len(b), (size, len(b)))].mean(axis=1)
+        replicates.append(resample_a - resample_b)
+    return observed, _pvalue(replicates, observed, n_resamples, alternative)
+
+
+RESAMPLING_TESTS = {'permutation': permutation_test, 'bootstrap': bootstrap_test}
+
+
+def pairwise_resampling_tests(values, groups, test='permutation', n_resamples=10000, alternative='two-sided',
+                              chunk_size=None, seed=None):
+    # Resampling test between every pair of groups, eg. values=corners per match and groups=team.
+    # Every pair gets its own random stream spawned from seed, so results don't depend on the order of the pairs.
+    test = RESAMPLING_TESTS.get(test, test)
+    samples = {name: sample.to_numpy() for name, sample in pd.Series(np.asarray(values), index=np.asarray(groups)).groupby(level=0)}
+    names = sorted(samples)
+    pairs = [(first, second) for i, first in enumerate(names) for second in names[i + 1:]]
+    streams = np.random.SeedSequence(seed).spawn(len(pairs))
+    rows = []
+    for (first, second), stream in zip(pairs, streams):
+        observed, pvalue = test(samples[first], samples[second], n_resamples=n_resamples, alternative=alternative,
+                                chunk_size=chunk_size, seed=stream)
+        rows.append((first, second, observed, pvalue))
+    return pd.DataFrame(rows, columns=['group1', 'group2', 'difference', 'pvalue'])
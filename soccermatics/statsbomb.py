@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from mplsoccer import Sblocal, Sbopen
+
+from soccermatics import schema
+from soccermatics.cache import CACHE_EXT, read_frame, write_frame
+
+EVENT_TABLES = ('event', 'related', 'freeze', 'tactics')
+FRAME_TABLES = ('frame', 'visible')
+
+
+class EventStore:
+    # Drop-in replacement for Sbopen that keeps every parsed frame in a local cache keyed by match id,
+    # so a match is downloaded and flattened once no matter how many scripts use it.
+    # Pass local_root to read a local copy of the open-data repository (the directory containing
+    # competitions.json, matches/, events/, lineups/ and three-sixty/) instead of downloading.
+    # With compact=True the events and frames come with the dtypes of soccermatics.schema.
+
+    def __init__(self, cache_dir=None, local_root=None, max_workers=8, compact=True):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.getcwd(), 'data', 'StatsBomb', '.cache')
+        self.cache_dir = cache_dir
+        self.local_root = local_root
+        self.max_workers = max_workers
+        self.compact = compact
+        self.parser = Sbopen() if local_root is None else Sblocal()
+
+    def _source(self, folder, match_id):
+        # Sbopen wants the match id, Sblocal the path to the file
+        if self.local_root is None:
+            return match_id
+        return os.path.join(self.local_root, folder, f'{match_id}.json')
+
+    def _compact(self, frames, names, tables, dtypes):
+        # the compact dtypes for the first table, the events or frames, which holds nearly all the rows
+        if not self.compact or names[0] not in tables:
+            return frames
+        i = tables.index(names[0])
+        return frames[:i] + (schema.compact(frames[i], dtypes, names=True),) + frames[i + 1:]
+
+    def _cached(self, key, names, fetch, refresh=False, tables=None, columns=None, filters=None):
+        # tables picks which of names to return, the rest are never read from the cache.
+        # columns and filters are pushed down into the read of the first table (events or frames), see read_frame
+        paths = {name: os.path.join(self.cache_dir, key, name + CACHE_EXT) for name in names}
+        tables = names if tables is None else tables
+        if refresh or not all(os.path.exists(path) for path in paths.values()):
+            # the parser returns None for tables a match has no rows for, store those as empty frames
+            frames = tuple(pd.DataFrame() if df is None else df for df in fetch())
+            for df, name in zip(frames, names):
+                write_frame(df, paths[name])
+            if columns is None and filters is None:
+                return tuple(frames[names.index(name)] for name in tables)
+            del frames
+        return tuple(read_frame(paths[name], columns, filters) if name == names[0] else read_frame(paths[name])
+                     for name in tables)
+
+    def competition(self, refresh=False):
+        if self.local_root is None:
+            fetch = lambda: (self.parser.competition(),)
+        else:
+            fetch = lambda: (self.parser.competition(os.path.join(self.local_root, 'competitions.json')),)
+        return self._cached('competitions', ('competition',), fetch, refresh)[0]
+
+    def match(self, competition_id, season_id, refresh=False):
+        if self.local_root is None:
+            fetch = lambda: (self.parser.match(competition_id, season_id),)
+        else:
+            path = os.path.join(self.local_root, 'matches', str(competition_id), f'{season_id}.json')
+            fetch = lambda: (self.parser.match(path),)
+        return self._cached(os.path.join('matches', f'{competition_id}_{season_id}'), ('match',), fetch, refresh)[0]
+
+    def event(self, match_id, refresh=False, tables=EVENT_TABLES, columns=None, filters=None):
+        # tables=('event',) skips the related, freeze and tactics tables, columns and filters
+        # (eg. [('type_name', '==', 'Pass')]) select what is read of the events
+        fetch = lambda: self.parser.event(self._source('events', match_id))
+        frames = self._cached(os.path.join('events', str(match_id)), EVENT_TABLES, fetch, refresh,
+                              tables, columns, filters)
+        return self._compact(frames, EVENT_TABLES, tables, schema.STATSBOMB_EVENTS)
+
+    def lineup(self, match_id, refresh=False):
+        fetch = lambda: (self.parser.lineup(self._source('lineups', match_id)),)
+        return self._cached(os.path.join('lineups', str(match_id)), ('lineup',), fetch, refresh)[0]
+
+    def frame(self, match_id, refresh=False, tables=FRAME_TABLES, columns=None, filters=None):
+        fetch = lambda: self.parser.frame(self._source('three-sixty', match_id))
+        frames = self._cached(os.path.join('three-sixty', str(match_id)), FRAME_TABLES, fetch, refresh,
+                              tables, columns, filters)
+        return self._compact(frames, FRAME_TABLES, tables, schema.STATSBOMB_FRAMES)
+
+    def _batch(self, load, matches, refresh=False, **kwargs):
+        # matches is a parser.match() listing or any iterable of match ids
+        if isinstance(matches, pd.DataFrame):
+            matches = matches['match_id']
+        match_ids = list(dict.fromkeys(int(match_id) for match_id in matches))
+        # downloading dominates, so threads are enough and max_workers bounds the open connections
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda match_id: load(match_id, refresh=refresh, **kwargs), match_ids))
+        # one concat per table rather than growing the frames match by match
+        return tuple(schema.concat([result[i] for result in results])
+                     for i in range(len(results[0]))) if results else ()
+
+    def events(self, matches, refresh=False, tables=EVENT_TABLES, columns=None, filters=None):
+        # events, related, freeze and tactics for every match, loaded concurrently
+        return self._batch(self.event, matches, refresh, tables=tables, columns=columns, filters=filters)
+
+    def frames(self, matches, refresh=False, tables=FRAME_TABLES, columns=None, filters=None):
+        # 360 frames and visible areas for every match, loaded concurrently
+        return self._batch(self.frame, matches, refresh, tables=tables, columns=columns, filters=filters)
+
+    def scan(self, matches, columns=None, filters=None, refresh=False):
+        # only the events of every match, with just the given columns and the rows matching filters,
+        # eg. parser.scan(matches, ['x', 'y', 'end_x', 'end_y'], [('type_name', '==', 'Pass')])
+        return self.events(matches, refresh, tables=('event',), columns=columns, filters=filters)[0]
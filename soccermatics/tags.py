@@ -0,0 +1,65 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Wyscout event tags, see the Wyscout API docs for their meaning.
+# Each tag gets one bit of a uint64 mask, there are 59 so they all fit.
+TAGS = {
+    101: 'goal', 102: 'own_goal', 201: 'opportunity', 301: 'assist', 302: 'key_pass',
+    401: 'left_foot', 402: 'right_foot', 403: 'head_body',
+    501: 'free_space_right', 502: 'free_space_left', 503: 'take_on_left', 504: 'take_on_right',
+    601: 'anticipated', 602: 'anticipation', 701: 'lost', 702: 'neutral', 703: 'won',
+    801: 'high', 802: 'low', 901: 'through', 1001: 'fairplay', 1101: 'direct', 1102: 'indirect',
+    1201: 'goal_low_center', 1202: 'goal_low_right', 1203: 'goal_center', 1204: 'goal_center_left',
+    1205: 'goal_low_left', 1206: 'goal_center_right', 1207: 'goal_high_center', 1208: 'goal_high_left',
+    1209: 'goal_high_right', 1210: 'out_low_right', 1211: 'out_center_left', 1212: 'out_low_left',
+    1213: 'out_center_right', 1214: 'out_high_center', 1215: 'out_high_left', 1216: 'out_high_right',
+    1217: 'post_low_right', 1218: 'post_center_left', 1219: 'post_low_left', 1220: 'post_center_right',
+    1221: 'post_high_center', 1222: 'post_high_left', 1223: 'post_high_right',
+    1301: 'feint', 1302: 'missed_ball', 1401: 'interception', 1501: 'clearance', 1601: 'sliding_tackle',
+    1701: 'red_card', 1702: 'yellow_card', 1703: 'second_yellow_card', 1801: 'accurate', 1802: 'not_accurate',
+    1901: 'counter_attack', 2001: 'dangerous_ball_lost', 2101: 'blocked',
+}
+TAG_IDS = np.array(sorted(TAGS))
+TAG_BITS = {tag_id: np.uint64(1) << np.uint64(i) for i, tag_id in enumerate(TAG_IDS)}
+TAG_NAMES = {name: tag_id for tag_id, name in TAGS.items()}
+
+_TAGS_TYPE = pa.list_(pa.struct([('id', pa.int64())]))
+
+
+def bits(*tags):
+    # combined mask for tags given by name ('left_foot') or id (401)
+    mask = np.uint64(0)
+    for tag in tags:
+        mask |= TAG_BITS[TAG_NAMES.get(tag, tag)]
+    return mask
+
+
+def encode(tags):
+    # decode a column of Wyscout tag lists, eg. [{'id': 401}, {'id': 1801}], into uint64 masks
+    # the lists are flattened by Arrow so there is no Python loop over the rows
+    tags = pa.array(tags, type=_TAGS_TYPE, from_pandas=True)
+    rows = pc.list_parent_indices(tags).to_numpy()
+    ids = pc.struct_field(pc.list_flatten(tags), 'id').to_numpy(zero_copy_only=False)
+    index = np.searchsorted(TAG_IDS, ids).clip(0, len(TAG_IDS) - 1)
+    # ignore tag ids we don't know about
+    known = TAG_IDS[index] == ids
+    mask = np.zeros(len(tags), dtype=np.uint64)
+    np.bitwise_or.at(mask, rows[known], np.uint64(1) << index[known].astype(np.uint64))
+    return mask
+
+
+def decode(mask):
+    # names of the tags set in a single mask
+    return [TAGS[tag_id] for tag_id, bit in TAG_BITS.items() if mask & bit]
+
+
+def has_tags(df, *tags):
+    # events having all of the given tags
+    mask = bits(*tags)
+    return (df['tag_mask'].to_numpy() & mask) == mask
+
+
+def has_any_tag(df, *tags):
+    # events having at least one of the given tags
+    return (df['tag_mask'].to_numpy() & bits(*tags)) != 0
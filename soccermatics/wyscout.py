@@ -0,0 +1,132 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from soccermatics import schema, tags
+from soccermatics.cache import cached_frame
+
+# bump when the columns derived in read_events change so old caches are rebuilt
+EVENTS_VERSION = 3
+
+
+def data_path(*parts, root=None):
+    # data lives in data/Wyscout under the working directory, same as the scripts expect
+    if root is None:
+        root = os.path.join(os.getcwd(), 'data', 'Wyscout')
+    return os.path.join(root, *parts)
+
+
+def read_json(path):
+    with open(path) as f:
+        df = pd.read_json(f)
+    # some Wyscout id columns use the string 'null' for missing values, eg. currentNationalTeamId
+    for column in df.columns:
+        if column.endswith('Id') and df[column].dtype == object:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    return df
+
+
+_POSITIONS_TYPE = pa.list_(pa.struct([('y', pa.float64()), ('x', pa.float64())]))
+
+
+def coordinates(positions):
+    # start and end of every event from a column of Wyscout positions, eg. [{'y': 32, 'x': 79}, {'y': 68, 'x': 90}]
+    # as x, y, end_x and end_y columns in Wyscout units, NaN where an event has no such position
+    positions = pa.array(positions, type=_POSITIONS_TYPE, from_pandas=True)
+    offsets = positions.offsets.to_numpy()
+    flat = pc.list_flatten(positions)
+    x = pc.struct_field(flat, 'x').to_numpy(zero_copy_only=False)
+    y = pc.struct_field(flat, 'y').to_numpy(zero_copy_only=False)
+    first, lengths = offsets[:-1] - offsets[0], np.diff(offsets)
+    columns = {}
+    for names, position, present in ((('x', 'y'), first, lengths >= 1), (('end_x', 'end_y'), first + 1, lengths >= 2)):
+        for name, values in zip(names, (x, y)):
+            column = np.full(len(positions), np.nan, dtype=np.float32)
+            column[present] = values[position[present]]
+            columns[name] = column
+    return pd.DataFrame(columns)
+
+
+def read_events(path):
+    df = read_json(path)
+    # decode the tag lists once so tag filters are bitwise operations, see soccermatics.tags
+    df['tag_mask'] = tags.encode(df['tags'])
+    # and the positions into flat coordinate columns
+    df[['x', 'y', 'end_x', 'end_y']] = coordinates(df['positions']).to_numpy()
+    # cached with the compact dtypes, see soccermatics.schema
+    return schema.compact(df, schema.WYSCOUT_EVENTS)
+
+
+def load(path, refresh=False, json_columns=()):
+    return cached_frame(path, read_json, refresh=refresh, json_columns=json_columns)
+
+
+def load_events(competition='England', root=None, refresh=False, columns=None, filters=None):
+    # columns and filters (eg. [('eventName', '==', 'Shot')]) are applied while reading the cache,
+    # so only the selected columns and rows are materialized
+    return cached_frame(data_path('events', f'events_{competition}.json', root=root), read_events,
+                        refresh=refresh, version=EVENTS_VERSION, columns=columns, filters=filters)
+
+
+def competitions(root=None):
+    # competition names taken from the events_<competition>.json files on disk
+    paths = sorted(glob.glob(data_path('events', 'events_*.json', root=root)))
+    return [os.path.basename(path)[len('events_'):-len('.json')] for path in paths]
+
+
+def _timed_load_events(args):
+    # runs in a worker process: parse and cache one file, sending back only the time it took
+    # so the frame itself is never pickled between processes
+    competition, root, refresh = args
+    start = time.perf_counter()
+    load_events(competition, root=root, refresh=refresh)
+    return time.perf_counter() - start
+
+
+def load_all_events(root=None, refresh=False, processes=None, verbose=True, columns=None, filters=None):
+    # read every events_*.json in a process pool and combine them with one concat
+    # The pool needs the calling script behind an if __name__ == '__main__': guard where processes are
+    # spawned (macOS, Windows), processes=1 reads the files one by one in this process instead.
+    names = competitions(root)
+    if not names:
+        raise FileNotFoundError('no events_*.json files in ' + data_path('events', root=root))
+    jobs = [(name, root, refresh) for name in names]
+    if processes == 1:
+        seconds = [_timed_load_events(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            seconds = list(pool.map(_timed_load_events, jobs))
+
+    frames = []
+    for name, elapsed in zip(names, seconds):
+        # the worker left a fresh cache behind, so this is a memory mapped read
+        df = load_events(name, root=root, columns=columns, filters=filters)
+        if verbose:
+            print(f'events_{name}.json: {len(df)} events read in {elapsed:.2f}s')
+        df['competition'] = pd.Categorical([name] * len(df), categories=names)
+        frames.append(df)
+    return schema.concat(frames)
+
+
+def load_matches(competition='England', root=None, refresh=False):
+    # teamsData is keyed by team id, which differs per match
+    return load(data_path('matches', f'matches_{competition}.json', root=root), refresh=refresh,
+                json_columns=('teamsData',))
+
+
+def load_players(root=None, refresh=False):
+    return load(data_path('players.json', root=root), refresh=refresh)
+
+
+def load_teams(root=None, refresh=False):
+    return load(data_path('teams.json', root=root), refresh=refresh)
+
+
+def load_competitions(root=None, refresh=False):
+    return load(data_path('competitions.json', root=root), refresh=refresh)
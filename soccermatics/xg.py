@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from soccermatics import wyscout
+from soccermatics.cache import cached_frame
+from soccermatics.normalize import PITCH_LENGTH, PITCH_WIDTH, to_metric
+from soccermatics.tags import has_tags
+
+# Expected goals (xG): the chance a shot is scored, from a logistic regression on where it was taken
+# and with which body part. Features are computed on the metric pitch of soccermatics.normalize, so
+# a model fitted on Wyscout shots scores StatsBomb shots as well.
+
+# bump when the features change so cached shot tables are rebuilt
+XG_VERSION = 1
+GOAL_WIDTH = 7.32
+FEATURES = ('distance', 'angle', 'header')
+
+
+def shot_features(shots, provider=None):
+    # distance (m) to the centre of the goal, angle (radians) the goal mouth spans from the shot and
+    # whether it was a header, for shot rows of either provider in their own coordinates, or of
+    # tables already on the metric pitch with provider=None
+    metric = shots[['x', 'y']] if provider is None else to_metric(shots[['x', 'y']], provider)
+    dx = PITCH_LENGTH - metric['x'].to_numpy(float)
+    dy = np.abs(PITCH_WIDTH / 2 - metric['y'].to_numpy(float))
+    angle = np.arctan2(GOAL_WIDTH * dx, dx ** 2 + dy ** 2 - (GOAL_WIDTH / 2) ** 2)
+    # arctan2 is negative for shots wide of the posts behind the goal line's plane, the angle is then past 90 degrees
+    angle = np.where(angle < 0, angle + np.pi, angle)
+    # StatsBomb names the body part, Wyscout tags it
+    if 'body_part_name' in shots.columns:
+        header = (shots['body_part_name'] == 'Head').to_numpy()
+    else:
+        header = has_tags(shots, 'head_body')
+    return pd.DataFrame({'distance': np.hypot(dx, dy), 'angle': angle, 'header': header.astype(np.int8)},
+                        index=shots.index)
+
+
+def shot_table(events, provider):
+    # features and outcome of the shots in an event table
+    if provider == 'statsbomb':
+        shots = events.loc[events['type_name'] == 'Shot']
+        goal = (shots['outcome_name'] == 'Goal').to_numpy()
+    else:
+        shots = events.loc[events['eventName'] == 'Shot']
+        goal = has_tags(shots, 'goal')
+    table = shot_features(shots, provider)
+    table['goal'] = goal.astype(np.int8)
+    return table
+
+
+def load_wyscout_shots(competition='England', root=None, refresh=False):
+    # shot features of a Wyscout competition, cached next to its events file
+    def build(path):
+        events = wyscout.load_events(competition, root=root, columns=['eventName', 'x', 'y', 'tag_mask'],
+                                     filters=[('eventName', '==', 'Shot')])
+        return shot_table(events, 'wyscout').reset_index(drop=True)
+
+    path = wyscout.data_path('events', f'events_{competition}.json', root=root)
+    return cached_frame(path, build, refresh=refresh, version=XG_VERSION, name=f'shots_{competition}')
+
+
+class ExpectedGoals:
+    # logistic regression coefficients of the features, scoring is one matrix product
+
+    def __init__(self, params):
+        self.params = pd.Series(params)
+
+    @classmethod
+    def fit(cls, shots):
+        # shots with the FEATURES and goal columns, eg. from shot_table
+        # shots recorded without a location have no distance or angle and are left out
+        shots = shots.dropna(subset=list(FEATURES))
+        X = sm.add_constant(shots[list(FEATURES)].to_numpy(float))
+        result = sm.Logit(shots['goal'].to_numpy(float), X).fit(disp=False)
+        model = cls(dict(zip(('const',) + FEATURES, result.params)))
+        model.summary = result.summary(xname=['const', *FEATURES])
+        return model
+
+    def predict(self, features):
+        # xG of every row of a feature table
+        coefficients = self.params[list(FEATURES)].to_numpy()
+        logits = self.params['const'] + features[list(FEATURES)].to_numpy(float) @ coefficients
+        return pd.Series(1 / (1 + np.exp(-logits)), index=features.index, name='xg')
+
+    def score(self, shots, provider=None):
+        # xG of the shot rows of either provider, see shot_features
+        return self.predict(shot_features(shots, provider))
+
+
+def fit_wyscout(competitions=None, root=None, refresh=False):
+    # xG model fitted on the shots of the Wyscout competitions, by default all of them
+    if competitions is None:
+        competitions = wyscout.competitions(root)
+    shots = pd.concat([load_wyscout_shots(name, root, refresh) for name in competitions], ignore_index=True)
+    return ExpectedGoals.fit(shots)
@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from soccermatics import wyscout
+from soccermatics.cache import cached_frame
+from soccermatics.heatmaps import Grid, uniform_grid
+from soccermatics.normalize import normalize, to_metric
+from soccermatics.tags import has_tags
+
+# Expected threat (xT): the chance that possession of the ball in a zone ends in a goal within the
+# next few actions. From each zone a player shoots or moves the ball, so
+#   xT = P(shot) * P(goal | shot) + P(move) * T @ xT
+# where T[i, j] is the chance a move from zone i ends successfully in zone j. Iterating this from xT = 0
+# adds one more action to the horizon each time. Zones are a 16x12 grid of the metric pitch.
+
+# bump when the fit changes so cached grids are refitted
+XT_VERSION = 1
+XT_COLUMNS, XT_ROWS = 16, 12
+
+
+def actions(events, provider):
+    # moves (passes, and carries for StatsBomb) and shots of normalized events with their outcome:
+    # columns x, y, end_x, end_y, move, shot, successful and goal
+    kind = events['type_name']
+    if provider == 'statsbomb':
+        move = kind.isin(['Pass', 'Carry']).to_numpy()
+        successful = events['outcome_name'].isna().to_numpy()
+        goal = (events['outcome_name'] == 'Goal').to_numpy()
+    else:
+        move = (kind == 'Pass').to_numpy()
+        successful = has_tags(events, 'accurate')
+        goal = has_tags(events, 'goal')
+    shot = (kind == 'Shot').to_numpy()
+    keep = move | shot
+    table = events.loc[keep, ['x', 'y', 'end_x', 'end_y']].reset_index(drop=True)
+    table['move'], table['shot'] = move[keep], shot[keep]
+    table['successful'] = successful[keep] & move[keep]
+    table['goal'] = goal[keep] & shot[keep]
+    return table
+
+
+class ExpectedThreat:
+    # xT of each zone of a grid, fitted by fit() or read from a frame of zones
+
+    def __init__(self, grid, xt, probabilities=None):
+        self.grid = grid
+        self.xt = np.asarray(xt, dtype=float)
+        # shot, move and goal probabilities of each zone, kept for inspection
+        self.probabilities = probabilities
+
+    @classmethod
+    def fit(cls, actions, grid=None, tolerance=1e-6, max_iterations=100):
+        # actions as returned by actions(), eg. from a season of events
+        grid = uniform_grid(XT_COLUMNS, XT_ROWS) if grid is None else grid
+        start = grid.bin(actions['x'], actions['y'])
+        end = grid.bin(actions['end_x'], actions['end_y'])
+        move, shot = actions['move'].to_numpy(), actions['shot'].to_numpy()
+        inside = start >= 0
+        counts = lambda mask: np.bincount(start[mask & inside], minlength=grid.size).astype(float)
+        moves, shots, goals = counts(move), counts(shot), counts(actions['goal'].to_numpy())
+        total = np.maximum(moves + shots, 1)
+        shot_probability, move_probability = shots / total, moves / total
+        goal_probability = goals / np.maximum(shots, 1)
+
+        # successful moves from each zone to each zone, divided by all moves from the zone, so failed
+        # moves are the missing mass of each row
+        successful = actions['successful'].to_numpy() & inside & (end >= 0)
+        transitions = np.bincount(start[successful] * grid.size + end[successful],
+                                  minlength=grid.size ** 2).reshape(grid.size, grid.size).astype(float)
+        transitions /= np.maximum(moves, 1)[:, None]
+
+        shoot_value = shot_probability * goal_probability
+        move_transitions = move_probability[:, None] * transitions
+        xt = np.zeros(grid.size)
+        for _ in range(max_iterations):
+            updated = shoot_value + move_transitions @ xt
+            converged = np.abs(updated - xt).max() < tolerance
+            xt = updated
+            if converged:
+                break
+        probabilities = pd.DataFrame({'shot': shot_probability, 'move': move_probability, 'goal': goal_probability})
+        return cls(grid, xt, probabilities)
+
+    def value(self, x, y):
+        # xT at each location, NaN off the pitch
+        bins = self.grid.bin(x, y)
+        return np.where(bins >= 0, self.xt[bins.clip(0)], np.nan)
+
+    def move_value(self, moves, provider=None):
+        # xT added by each move, the xT of where it ended minus where it started. Unsuccessful moves add
+        # nothing. Pass provider for tables not on the metric pitch, eg. provider='statsbomb'.
+        if provider is not None:
+            moves = to_metric(moves, provider)
+        delta = self.value(moves['end_x'], moves['end_y']) - self.value(moves['x'], moves['y'])
+        if 'outcome_name' in moves.columns:
+            delta = np.where(moves['outcome_name'].isna(), delta, 0)
+        elif 'tag_mask' in moves.columns:
+            delta = np.where(has_tags(moves, 'accurate'), delta, 0)
+        return pd.Series(delta, index=moves.index, name='xt')
+
+    def to_frame(self):
+        # one row per zone, numbered row by row from the bottom left of the pitch
+        frame = pd.DataFrame({'xt': self.xt})
+        if self.probabilities is not None:
+            frame = frame.join(self.probabilities)
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame, grid=None):
+        grid = uniform_grid(XT_COLUMNS, XT_ROWS) if grid is None else grid
+        probabilities = frame[['shot', 'move', 'goal']] if 'shot' in frame.columns else None
+        return cls(grid, frame['xt'].to_numpy(), probabilities)
+
+    def save(self, path):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, version=XT_VERSION, x_edges=self.grid.x_edges, y_edges=self.grid.y_edges, xt=self.xt)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(Grid(data['x_edges'], data['y_edges']), data['xt'])
+
+
+def load_expected_threat(competition='England', root=None, refresh=False):
+    # xT fitted on the Wyscout events of a competition, cached next to its events file
+    def build(path):
+        events = wyscout.load_events(competition, root=root,
+                                     columns=['matchId', 'matchPeriod', 'teamId', 'eventName', 'x', 'y',
+                                              'end_x', 'end_y', 'tag_mask'],
+                                     filters=[('eventName', 'in', ['Pass', 'Shot'])])
+        return ExpectedThreat.fit(actions(normalize(events, 'wyscout'), 'wyscout')).to_frame()
+
+    path = wyscout.data_path('events', f'events_{competition}.json', root=root)
+    frame = cached_frame(path, build, refresh=refresh, version=XT_VERSION, name=f'xt_{competition}')
+    return ExpectedThreat.from_frame(frame)
+
+
+def statsbomb_expected_threat(parser, competition_id, season_id, refresh=False):
+    # xT fitted on the StatsBomb events of a competition, cached as an .npz file in the parser's cache
+    path = os.path.join(parser.cache_dir, 'xt', f'{competition_id}_{season_id}.npz')
+    if not refresh and os.path.exists(path):
+        # grids saved by another XT_VERSION, or before it was saved with them, are fitted again
+        with np.load(path) as data:
+            fresh = 'version' in data.files and int(data['version']) == XT_VERSION
+        if fresh:
+            return ExpectedThreat.load(path)
+    matches = parser.match(competition_id, season_id)
+    events = parser.scan(matches, ['match_id', 'period', 'team_id', 'type_name', 'outcome_name',
+                                   'x', 'y', 'end_x', 'end_y'],
+                         [('type_name', 'in', ['Pass', 'Carry', 'Shot'])])
+    model = ExpectedThreat.fit(actions(normalize(events, 'statsbomb'), 'statsbomb'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    model.save(path)
+    return model